@@ -0,0 +1,175 @@
+# Benchmarks of field, group, commitment and tree operations
+# Every benchmark is timed over several runs and reported as ops/sec and p50/p99 latency;
+# results can be written to JSON and compared against a saved baseline
+#
+# usage: python benchmark.py [--exponents 2 4] [--sizes 256] [--lengths 16 64] [--repeat 5]
+#                            [--output results.json] [--baseline baseline.json] [--threshold 0.2]
+
+from dumb25519 import Scalar, Point, ScalarVector, PointVector
+import argparse, contextlib, io, json, platform, random, sys, time
+import dumb25519, merkle, polycommit, polynomial, verkle, wire
+
+
+# run fn repeat times, after setup (untimed) if given; latencies are in seconds
+def measure(fn, repeat: int, setup=None) -> dict:
+    times = []
+    for i in range(repeat):
+        args = setup() if setup is not None else ()
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {'runs': repeat, 'ops_per_sec': repeat / sum(times),
+            'p50': _percentile(times, 50), 'p99': _percentile(times, 99)}
+
+
+# nearest-rank percentile of sorted values
+def _percentile(values: list, p: int) -> float:
+    return values[max(0, -(-len(values) * p // 100) - 1)]
+
+
+def bench_field_group(repeat: int) -> dict:
+    x = dumb25519.random_scalar()
+    P = dumb25519.random_point()
+    Q = dumb25519.random_point()
+    return {
+        'scalar_invert': measure(lambda: x.invert(), repeat * 100),
+        'point_add': measure(lambda: P + Q, repeat * 100),
+        'point_mul': measure(lambda: x * P, repeat * 10),
+        'hash_to_scalar': measure(lambda: dumb25519.hash_bytes_to_scalar('benchmark', x), repeat * 100),
+    }
+
+
+# multiexp, interpolation and opening proofs for a vector length
+def bench_commitment(length: int, repeat: int) -> dict:
+    G_vec = PointVector([dumb25519.random_point() for i in range(length)])
+    G_table = dumb25519.FixedBaseTable(G_vec)
+    a_vec = ScalarVector([dumb25519.random_scalar() for i in range(length)])
+    r = dumb25519.random_scalar()
+    x = dumb25519.random_scalar()
+    v = polynomial.poly_eval(x, a_vec)
+    P = polycommit.commit(G_vec, a_vec, r, G_table)
+    proof = polycommit.prove(G_vec, P, x, v, a_vec, r, G_table=G_table)
+    coords = [(Scalar(i + 1), a) for i, a in enumerate(a_vec)]
+    results = {
+        f'multiexp/n={length}': measure(lambda: a_vec ** G_vec, repeat),
+        f'multiexp_table/n={length}': measure(lambda: G_table.multiexp(a_vec), repeat),
+        f'interpolate/n={length}': measure(lambda: polynomial.domain(length).interpolate(a_vec), repeat),
+        f'prove/n={length}': measure(lambda: polycommit.prove(G_vec, P, x, v, a_vec, r, G_table=G_table), repeat),
+        f'verify/n={length}': measure(lambda: polycommit.verify(proof, G_table), repeat),
+    }
+    if length <= 16:   # O(n^3), only for small vectors
+        results[f'lagrange/n={length}'] = measure(lambda: polynomial.lagrange(coords), repeat)
+    return results
+
+
+# build, proof and verification of a Verkle tree and of a Merkle tree over the same data
+def bench_trees(exponent: int, size: int, repeat: int) -> dict:
+    data = [f'block {i}' for i in range(size)]
+    tag = f'e={exponent},size={size}'
+    quiet = contextlib.redirect_stdout(io.StringIO())   # requestData prints a notice
+
+    tree = verkle.VerkleTree(data, exponent)
+    root = tree.buildVerkleTree()   # also warms up the public parameters and their tables
+    results = {f'verkle_build/{tag}': measure(lambda: verkle.VerkleTree(data, exponent).buildVerkleTree(), repeat)}
+
+    def request_setup():
+        tree.proof_cache.clear()   # time the proofs, not the cache
+        return (random.randrange(size),)
+    with quiet:
+        results[f'verkle_proof/{tag}'] = measure(tree.requestData, repeat, request_setup)
+        index = random.randrange(size)
+        datum, proofs = tree.requestData(index)
+    results[f'verkle_verify/{tag}'] = measure(lambda: verkle.verifier(index, datum, proofs, root, exponent, tree.depth, tree.basis_table), repeat)
+    results[f'verkle_proof_bytes/{tag}'] = wire.proof_size(proofs)['total']
+
+    merkletree = merkle.MerkleTree(data)
+    results[f'merkle_build/size={size}'] = measure(lambda: merkle.MerkleTree(data).buildMerkleTree(), repeat)
+    merkleroot = merkletree.buildMerkleTree()
+    results[f'merkle_proof/size={size}'] = measure(merkletree.requestData, repeat, lambda: (random.randrange(size),))
+    datum, hashes = merkletree.requestData(index)
+    results[f'merkle_verify/size={size}'] = measure(lambda: merkle.verifier(index, datum, hashes, merkleroot), repeat)
+    results[f'merkle_proof_bytes/size={size}'] = 32 * len(hashes)
+    return results
+
+
+# side-by-side Merkle and Verkle figures for every tree benchmark in results
+def comparison(results: dict) -> list:
+    rows = []
+    for name in results:
+        if not name.startswith('verkle_build/'):
+            continue
+        tag = name.split('/', 1)[1]
+        size = tag.split('size=')[1]
+        row = {'tree': tag}
+        for metric in ('build', 'proof', 'verify'):
+            row[f'verkle_{metric}_p50'] = results[f'verkle_{metric}/{tag}']['p50']
+            row[f'merkle_{metric}_p50'] = results[f'merkle_{metric}/size={size}']['p50']
+        row['verkle_proof_bytes'] = results[f'verkle_proof_bytes/{tag}']
+        row['merkle_proof_bytes'] = results[f'merkle_proof_bytes/size={size}']
+        rows.append(row)
+    return rows
+
+
+def run(exponents: list, sizes: list, lengths: list, repeat: int) -> dict:
+    results = bench_field_group(repeat)
+    for length in lengths:
+        results.update(bench_commitment(length, repeat))
+    for exponent in exponents:
+        for size in sizes:
+            if size < 2 ** exponent or (size.bit_length() - 1) % exponent != 0 or size & (size - 1) != 0:
+                continue   # not a power of 2 ** exponent
+            results.update(bench_trees(exponent, size, repeat))
+    return results
+
+
+# benchmarks whose p50 grew by more than threshold (a fraction) over the baseline
+def regressions(results: dict, baseline: dict, threshold: float) -> list:
+    slower = []
+    for name, stats in results.items():
+        old = baseline.get(name)
+        if isinstance(stats, dict) and isinstance(old, dict) and stats['p50'] > old['p50'] * (1 + threshold):
+            slower.append((name, old['p50'], stats['p50']))
+    return slower
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks of verklebp operations')
+    parser.add_argument('--exponents', type=int, nargs='+', default=[2, 4], help='tree arities, as 2 ** exponent')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[256], help='numbers of datablocks')
+    parser.add_argument('--lengths', type=int, nargs='+', default=[16, 64], help='vector lengths')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per benchmark')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='compare against the results in this JSON file')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed p50 slowdown over the baseline')
+    args = parser.parse_args(argv)
+
+    results = run(args.exponents, args.sizes, args.lengths, args.repeat)
+    for name, stats in results.items():
+        if isinstance(stats, dict):
+            print(f'{name:40} {stats["ops_per_sec"]:12.2f} ops/s   p50 {stats["p50"] * 1000:10.3f} ms   p99 {stats["p99"] * 1000:10.3f} ms')
+        else:
+            print(f'{name:40} {stats:12} bytes')
+    for row in comparison(results):
+        print(f'\nMerkle vs Verkle ({row["tree"]}):')
+        for metric in ('build', 'proof', 'verify'):
+            print(f'    {metric:8} merkle {row[f"merkle_{metric}_p50"] * 1000:10.3f} ms   verkle {row[f"verkle_{metric}_p50"] * 1000:10.3f} ms')
+        print(f'    {"bytes":8} merkle {row["merkle_proof_bytes"]:10}      verkle {row["verkle_proof_bytes"]:10}')
+
+    if args.output:
+        meta = {'python': platform.python_version(), 'time': time.time(), 'args': vars(args)}
+        with open(args.output, 'w') as f:
+            json.dump({'meta': meta, 'results': results, 'comparison': comparison(results)}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        slower = regressions(results, baseline, args.threshold)
+        for name, old, new in slower:
+            print(f'REGRESSION {name}: p50 {old * 1000:.3f} ms -> {new * 1000:.3f} ms')
+        if slower:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -49,7 +49,9 @@ class Scalar:
                     self.x = l # technically not in scalar field; used for main subgroup membership
                 else:
                     x = bytes.fromhex(x)
-                    self.x = sum(2**i * bit(x,i) for i in range(0,b)) % l
+                    if len(x) < b//8:
+                        raise IndexError
+                    self.x = int.from_bytes(x[:b//8],'little') % l
             except:
                 raise TypeError
         else:
@@ -139,10 +141,23 @@ class Scalar:
             return self.x >= y.x
         raise TypeError
 
+    # Canonical 32-byte little-endian encoding
+    def to_bytes(self):
+        return self.x.to_bytes(b//8,'little')
+
+    # Decode a canonical encoding
+    @classmethod
+    def from_bytes(cls,data):
+        if len(data) != b//8:
+            raise ValueError
+        x = int.from_bytes(data,'little')
+        if x >= l:
+            raise ValueError
+        return cls(x)
+
     # Hex representation
     def __repr__(self):
-        bits = [(self.x >> i) & 1 for i in range(b)]
-        return bytes.hex(bytes([sum([bits[i*8+j] << j for j in range(8)]) for i in range(b//8)]))
+        return self.to_bytes().hex()
 
     # Return underlying integer
     def __int__(self):
@@ -160,13 +175,57 @@ class Scalar:
     def __neg__(self):
         return Scalar(-self.x)
 
+# Extended twisted Edwards coordinates (X:Y:Z:T) with x = X/Z, y = Y/Z, x*y = T/Z
+# Internal group operations work on tuples and never invert or check the curve
+d2 = (2*d) % q
+
+def _padd(P,Q):
+    X1,Y1,Z1,T1 = P
+    X2,Y2,Z2,T2 = Q
+    A = (Y1-X1)*(Y2-X2) % q
+    B = (Y1+X1)*(Y2+X2) % q
+    C = T1*d2*T2 % q
+    D = 2*Z1*Z2 % q
+    E = B-A
+    F = D-C
+    G = D+C
+    H = B+A
+    return (E*F % q, G*H % q, F*G % q, E*H % q)
+
+def _pdbl(P):
+    X1,Y1,Z1,_ = P
+    A = X1*X1 % q
+    B = Y1*Y1 % q
+    C = 2*Z1*Z1 % q
+    H = A+B
+    E = H - (X1+Y1)*(X1+Y1) % q
+    G = A-B
+    F = C+G
+    return (E*F % q, G*H % q, F*G % q, E*H % q)
+
+def _pneg(P):
+    X1,Y1,Z1,T1 = P
+    return ((-X1) % q, Y1, Z1, (-T1) % q)
+
+# Double-and-add over the bits of a nonnegative integer
+def _pmul(P,n):
+    R = _identity
+    for i in range(n.bit_length()-1,-1,-1):
+        R = _pdbl(R)
+        if (n >> i) & 1:
+            R = _padd(R,P)
+    return R
+
+_identity = (0,1,1,0)
+
 # An element of the curve group
 class Point:
     def __init__(self,x,y=None):
         # Generated from integer values
         if isinstance(x,int) and isinstance(y,int) and y is not None:
-            self.x = x
-            self.y = y
+            x %= q
+            y %= q
+            self.ext = (x,y,1,x*y % q)
 
             if not self.on_curve():
                 raise ValueError
@@ -174,10 +233,14 @@ class Point:
         elif isinstance(x,str) and y is None:
             try:
                 x = bytes.fromhex(x)
-                self.y = sum(2**i * bit(x,i) for i in range(0,b-1))
-                self.x = xfromy(self.y)
-                if self.x & 1 != bit(x,b-1):
-                    self.x = q - self.x
+                if len(x) < b//8:
+                    raise IndexError
+                x = int.from_bytes(x[:b//8],'little')
+                y = x & ((1 << (b-1))-1)
+                x_ = xfromy(y)
+                if x_ & 1 != x >> (b-1):
+                    x_ = q - x_
+                self.ext = (x_,y,1,x_*y % q)
             except:
                 raise TypeError
 
@@ -186,53 +249,63 @@ class Point:
         else:
             raise TypeError
 
+    # Wrap an internal extended representation (no curve check)
+    @classmethod
+    def _from_ext(cls,P):
+        result = cls.__new__(cls)
+        result.ext = P
+        return result
+
+    # Convert to affine in place (Z = 1); only needed for the public coordinates
+    def _normalize(self):
+        X,Y,Z,_ = self.ext
+        if Z != 1:
+            zinv = invert(Z,q)
+            X = X*zinv % q
+            Y = Y*zinv % q
+            self.ext = (X,Y,1,X*Y % q)
+        return self.ext
+
+    # Affine coordinates
+    @property
+    def x(self):
+        return self._normalize()[0]
+
+    @property
+    def y(self):
+        return self._normalize()[1]
+
     # Equality
     def __eq__(self,Q):
         if isinstance(Q,Point):
-            return self.x == Q.x and self.y == Q.y
+            X1,Y1,Z1,_ = self.ext
+            X2,Y2,Z2,_ = Q.ext
+            return (X1*Z2 - X2*Z1) % q == 0 and (Y1*Z2 - Y2*Z1) % q == 0
         raise TypeError
 
     # Inequality
     def __ne__(self,Q):
         if isinstance(Q,Point):
-            return self.x != Q.x or self.y != Q.y
+            return not self == Q
         raise TypeError
     
     # Addition
     def __add__(self,Q):
         if isinstance(Q,Point):
-            x1 = self.x
-            y1 = self.y
-            x2 = Q.x
-            y2 = Q.y
-            x3 = (x1*y2+x2*y1) * invert(1+d*x1*x2*y1*y2,q)
-            y3 = (y1*y2+x1*x2) * invert(1-d*x1*x2*y1*y2,q)
-            return Point(x3 % q, y3 % q)
+            return Point._from_ext(_padd(self.ext,Q.ext))
         return NotImplemented
 
     # Subtraction
     def __sub__(self,Q):
         if isinstance(Q,Point):
-            x1 = self.x
-            y1 = self.y
-            x2 = -Q.x
-            y2 = Q.y
-            x3 = (x1*y2+x2*y1) * invert(1+d*x1*x2*y1*y2,q)
-            y3 = (y1*y2+x1*x2) * invert(1-d*x1*x2*y1*y2,q)
-            return Point(x3 % q, y3 % q)
+            return Point._from_ext(_padd(self.ext,_pneg(Q.ext)))
         return NotImplemented
 
     # Multiplication
     def __mul__(self,y):
         # Point-Scalar: scalar multiplication
         if isinstance(y,Scalar):
-            if y == Scalar(0):
-                return Point(0,1)
-            Q = self.__mul__(y/Scalar(2))
-            Q = Q.__add__(Q)
-            if y.x & 1:
-                Q = self.__add__(Q)
-            return Q
+            return Point._from_ext(_pmul(self.ext,y.x))
         return NotImplemented
 
     def __rmul__(self,y):
@@ -241,20 +314,42 @@ class Point:
             return self*y
         return NotImplemented
 
+    # Compressed 32-byte encoding: y with the parity of x in the top bit
+    def to_bytes(self):
+        X,Y,_,_ = self._normalize()
+        return (Y | ((X & 1) << (b-1))).to_bytes(b//8,'little')
+
+    # Decode a compressed encoding (the point must be on the curve, not necessarily in the main subgroup)
+    @classmethod
+    def from_bytes(cls,data):
+        if len(data) != b//8:
+            raise ValueError
+        n = int.from_bytes(data,'little')
+        y = n & ((1 << (b-1))-1)
+        if y >= q:
+            raise ValueError
+        x = xfromy(y)
+        if x & 1 != n >> (b-1):
+            if x == 0:
+                raise ValueError
+            x = q - x
+        return cls(x,y)
+
     # Hex representation
     def __repr__(self):
-        bits = [(self.y >> i) & 1 for i in range(b-1)] + [self.x & 1]
-        return bytes.hex(bytes([sum([bits[i*8+j] << j for j in range(8)]) for i in range(b//8)]))
+        return self.to_bytes().hex()
 
     # Curve membership (not main subgroup!)
     def on_curve(self):
-        x = self.x
-        y = self.y
-        return (-x*x + y*y - 1 - d*x*x*y*y) % q == 0
+        X,Y,Z,T = self.ext
+        XX = X*X
+        YY = Y*Y
+        ZZ = Z*Z
+        return (-XX + YY - ZZ - d*T*T) % q == 0 and (X*Y - Z*T) % q == 0
 
     # Negation
     def __neg__(self):
-        return Z - self
+        return Point._from_ext(_pneg(self.ext))
 
 # A vector of Points with superpowers
 class PointVector:
@@ -264,39 +359,46 @@ class PointVector:
         for point in points:
             if not isinstance(point,Point):
                 raise TypeError
-        self.points = points
+        self._points = list(points)   # a copy, so that no outside list can change the vector
+        self._digest = None
+
+    # Underlying Points, as a read-only tuple; write through __setitem__, append or extend,
+    # which keep the cached digest in sync
+    @property
+    def points(self):
+        return tuple(self._points)
 
     # Equality
     def __eq__(self,W):
         if isinstance(W,PointVector):
-            return self.points == W.points
+            return self._points == W._points
         raise TypeError
 
     # Inequality
     def __ne__(self,W):
         if isinstance(W,PointVector):
-            return self.points != W.points
+            return self._points != W._points
         raise TypeError
 
     # Addition
     def __add__(self,W):
-        if isinstance(W,PointVector) and len(self.points) == len(W.points):
-            return PointVector([self.points[i] + W.points[i] for i in range(len(self.points))])
+        if isinstance(W,PointVector) and len(self._points) == len(W._points):
+            return PointVector([self._points[i] + W._points[i] for i in range(len(self._points))])
         return NotImplemented
 
     # Subtraction
     def __sub__(self,W):
-        if isinstance(W,PointVector) and len(self.points) == len(W.points):
-            return PointVector([self.points[i] - W.points[i] for i in range(len(self.points))])
+        if isinstance(W,PointVector) and len(self._points) == len(W._points):
+            return PointVector([self._points[i] - W._points[i] for i in range(len(self._points))])
         return NotImplemented
 
     # Multiplication
     def __mul__(self,s):
         # PointVector-Scalar: componentwise Point-Scalar multiplication
         if isinstance(s,Scalar):
-            return PointVector([self.points[i]*s for i in range(len(self.points))])
+            return PointVector([self._points[i]*s for i in range(len(self._points))])
         # PointVector-ScalarVector: Hadamard product
-        if isinstance(s,ScalarVector) and len(self.points) == len(s.scalars):
+        if isinstance(s,ScalarVector) and len(self._points) == len(s.ints):
             return PointVector([s[i]*self[i] for i in range(len(self))])
         return NotImplemented
 
@@ -311,51 +413,67 @@ class PointVector:
 
     # Multiscalar multiplication
     def __pow__(self,s):
-        if isinstance(s,ScalarVector) and len(self.points) == len(s.scalars):
+        if isinstance(s,ScalarVector) and len(self._points) == len(s.ints):
             return multiexp(s,self)
         return NotImplemented
 
     # Length
     def __len__(self):
-        return len(self.points)
+        return len(self._points)
 
     # Get slice
     def __getitem__(self,i):
         if not isinstance(i,slice):
-            return self.points[i]
-        return PointVector(self.points[i])
+            return self._points[i]
+        return PointVector(self._points[i])
 
     # Set at index
     def __setitem__(self,i,P):
         if isinstance(P,Point):
-            self.points[i] = P
+            self._points[i] = P
+            self._digest = None
         else:
             raise TypeError
 
     # Append
     def append(self,item):
         if isinstance(item,Point):
-            self.points.append(item)
+            self._points.append(item)
+            self._digest = None
         else:
             raise TypeError
 
     # Extend
     def extend(self,items):
         if isinstance(items,PointVector):
-            for item in items.points:
-                self.points.append(item)
+            for item in items._points:
+                self._points.append(item)
+            self._digest = None
         else:
             raise TypeError
 
+    # Hash of the encoded Points, computed once and cached until the vector is modified
+    def digest(self):
+        if self._digest is None:
+            self._digest = blake2s(encode(self)).digest()
+        return self._digest
+
     # Hex representation of underlying Points
     def __repr__(self):
-        return repr(self.points)
+        return repr(self._points)
 
     # Negation
     def __neg__(self):
-        return PointVector([-P for P in self.points])
+        return PointVector([-P for P in self._points])
+
+# Wrap an already reduced integer as a Scalar (no reduction)
+def _scalar(x):
+    result = Scalar.__new__(Scalar)
+    result.x = x
+    return result
 
 # A vector of Scalars with superpowers
+# Elements are stored as reduced integers; Scalars are only created when indexed out
 class ScalarVector:
     def __init__(self,scalars=None):
         if scalars is None:
@@ -363,40 +481,53 @@ class ScalarVector:
         for scalar in scalars:
             if not isinstance(scalar,Scalar):
                 raise TypeError
-        self.scalars = scalars
+        self.ints = [scalar.x for scalar in scalars]
+
+    # Wrap a list of reduced integers (no copy, no reduction)
+    @classmethod
+    def _from_ints(cls,ints):
+        result = cls.__new__(cls)
+        result.ints = ints
+        return result
+
+    # Underlying Scalars, as a read-only tuple; write through __setitem__, append or extend
+    @property
+    def scalars(self):
+        return tuple(_scalar(x) for x in self.ints)
 
     # Equality
     def __eq__(self,s):
         if isinstance(s,ScalarVector):
-            return self.scalars == s.scalars
+            return self.ints == s.ints
         raise TypeError
 
     # Inequality
     def __ne__(self,s):
         if isinstance(s,ScalarVector):
-            return self.scalars != s.scalars
+            return self.ints != s.ints
         raise TypeError
 
     # Addition
     def __add__(self,s):
-        if isinstance(s,ScalarVector) and len(self.scalars) == len(s.scalars):
-            return ScalarVector([self.scalars[i] + s.scalars[i] for i in range(len(self.scalars))])
+        if isinstance(s,ScalarVector) and len(self.ints) == len(s.ints):
+            return ScalarVector._from_ints([(x + y) % l for x,y in zip(self.ints,s.ints)])
         return NotImplemented
 
     # Subtraction
     def __sub__(self,s):
-        if isinstance(s,ScalarVector) and len(self.scalars) == len(s.scalars):
-            return ScalarVector([self.scalars[i] - s.scalars[i] for i in range(len(self.scalars))])
+        if isinstance(s,ScalarVector) and len(self.ints) == len(s.ints):
+            return ScalarVector._from_ints([(x - y) % l for x,y in zip(self.ints,s.ints)])
         return NotImplemented
 
     # Multiplication
     def __mul__(self,s):
         # ScalarVector-Scalar: componentwise Scalar-Scalar multiplication 
         if isinstance(s,Scalar):
-            return ScalarVector([self.scalars[i]*s for i in range(len(self.scalars))])
+            y = s.x
+            return ScalarVector._from_ints([x*y % l for x in self.ints])
         # ScalarVector-ScalarVector: Hadamard product
-        if isinstance(s,ScalarVector) and len(self.scalars) == len(s.scalars):
-            return ScalarVector([self.scalars[i]*s.scalars[i] for i in range(len(self.scalars))])
+        if isinstance(s,ScalarVector) and len(self.ints) == len(s.ints):
+            return ScalarVector._from_ints([x*y % l for x,y in zip(self.ints,s.ints)])
         return NotImplemented
 
     def __rmul__(self,s):
@@ -407,59 +538,62 @@ class ScalarVector:
 
     # Sum of all Scalars
     def sum(self):
-        r = Scalar(0)
-        for i in range(len(self.scalars)):
-            r += self.scalars[i]
-        return r
+        return _scalar(sum(self.ints) % l)
 
     # Inner product and multiscalar multiplication
     def __pow__(self,s):
-        # ScalarVector**ScalarVector: inner product
-        if isinstance(s,ScalarVector) and len(self.scalars) == len(s.scalars):
-            r = Scalar(0)
-            for i in range(len(self.scalars)):
-                r += self.scalars[i]*s.scalars[i]
-            return r
+        # ScalarVector**ScalarVector: inner product, reduced once at the end
+        if isinstance(s,ScalarVector) and len(self.ints) == len(s.ints):
+            return _scalar(sum(x*y for x,y in zip(self.ints,s.ints)) % l)
         # ScalarVector**PointVector: multiscalar multiplication
         if isinstance(s,PointVector):
             return s**self
         return NotImplemented
 
+    # Fold halves in one pass: lo*x + hi*y, where lo and hi are the two halves of this vector
+    def fold(self,x,y):
+        if not isinstance(x,Scalar) or not isinstance(y,Scalar):
+            raise TypeError
+        ints = self.ints
+        half = len(ints)//2
+        x = x.x
+        y = y.x
+        return ScalarVector._from_ints([(ints[i]*x + ints[half+i]*y) % l for i in range(half)])
+
     # Length
     def __len__(self):
-        return len(self.scalars)
+        return len(self.ints)
 
     # Get slice
     def __getitem__(self,i):
         if not isinstance(i,slice):
-            return self.scalars[i]
-        return ScalarVector(self.scalars[i])
+            return _scalar(self.ints[i])
+        return ScalarVector._from_ints(self.ints[i])
 
     # Set at index
     def __setitem__(self,i,s):
         if isinstance(s,Scalar):
-            self.scalars[i] = s
+            self.ints[i] = s.x
         else:
             raise TypeError
 
     # Append
     def append(self,item):
         if isinstance(item,Scalar):
-            self.scalars.append(item)
+            self.ints.append(item.x)
         else:
             raise TypeError
 
     # Extend
     def extend(self,items):
         if isinstance(items,ScalarVector):
-            for item in items.scalars:
-                self.scalars.append(item)
+            self.ints.extend(items.ints)
         else:
             raise TypeError
 
     # Hex representation of underlying Scalars
     def __repr__(self):
-        return repr(self.scalars)
+        return repr(list(self.scalars))
 
     # Componentwise inversion (possibly with zero)
     def invert(self,allow_zero=False):
@@ -468,27 +602,27 @@ class ScalarVector:
             return ScalarVector([s.invert(allow_zero=True) for s in self.scalars])
 
         # Don't allow zero
-        inputs = self.scalars[:]
+        inputs = self.ints[:]
         n = len(inputs)
-        scratch = [Scalar(1)]*n
-        acc = Scalar(1)
+        scratch = [1]*n
+        acc = 1
 
         for i in range(n):
-            if inputs[i] == Scalar(0):
+            if inputs[i] == 0:
                 raise ZeroDivisionError
             scratch[i] = acc
-            acc *= inputs[i]
-        acc = Scalar(invert(acc.x,l))
+            acc = acc*inputs[i] % l
+        acc = invert(acc,l)
         for i in range(n-1,-1,-1):
-            temp = acc*inputs[i]
-            inputs[i] = acc*scratch[i]
+            temp = acc*inputs[i] % l
+            inputs[i] = acc*scratch[i] % l
             acc = temp
 
-        return ScalarVector(inputs)
+        return ScalarVector._from_ints(inputs)
 
     # Negation
     def __neg__(self):
-        return ScalarVector([-s for s in self.scalars])
+        return ScalarVector._from_ints([(-x) % l for x in self.ints])
 
 # Try to make a point from a given y-coordinate
 def make_point(y):
@@ -529,6 +663,60 @@ def hash_to_scalar(*data):
         if int(result,16) < l:
             return Scalar(int(result,16))
 
+# Domain tag of the bytes-based hashing API; bump the version whenever the encoding changes
+HASH_VERSION = b'dumb25519 hash v1'
+
+# Unambiguous byte encoding of hash input: a type byte, a 4-byte length, then the payload
+def encode(datum):
+    if isinstance(datum,(Scalar,Point)):
+        kind,payload = b'S' if isinstance(datum,Scalar) else b'P',datum.to_bytes()
+    elif isinstance(datum,ScalarVector):
+        kind,payload = b'V',b''.join(x.to_bytes(b//8,'little') for x in datum.ints)
+    elif isinstance(datum,PointVector):
+        kind,payload = b'W',b''.join(P.to_bytes() for P in datum._points)
+    elif isinstance(datum,bytes):
+        kind,payload = b'B',datum
+    elif isinstance(datum,str):
+        kind,payload = b'T',datum.encode('utf-8')
+    elif datum is None:
+        raise TypeError
+    else:
+        kind,payload = b'O',str(datum).encode('utf-8')
+    return kind + len(payload).to_bytes(4,'little') + payload
+
+# Hash data to get a Scalar, feeding raw encodings into blake2s
+def hash_bytes_to_scalar(*data):
+    h = blake2s(HASH_VERSION + b' scalar')
+    for datum in data:
+        h.update(encode(datum))
+    return _digest_to_scalar(h.digest())
+
+# Map a 32-byte digest to a Scalar
+# 252 bits are always below l and are statistically close to uniform in the scalar field
+def _digest_to_scalar(digest):
+    return _scalar(int.from_bytes(digest,'little') & ((1 << 252)-1))
+
+# Hash data to get a Point in the main subgroup, feeding raw encodings into blake2s
+def hash_bytes_to_point(*data):
+    h = blake2s(HASH_VERSION + b' point')
+    for datum in data:
+        h.update(encode(datum))
+    return _digest_to_point(h)
+
+# Map a hash state to a Point in the main subgroup
+def _digest_to_point(h):
+    # Try counters until we get a valid Point
+    counter = 0
+    while True:
+        candidate = h.copy()
+        candidate.update(counter.to_bytes(4,'little'))
+        try:
+            P = Point.from_bytes(candidate.digest())
+        except ValueError:
+            counter += 1
+            continue
+        return P*Scalar(cofactor)
+
 # Generate a random Scalar
 def random_scalar(zero=True):
     value = Scalar(secrets.randbelow(l))
@@ -548,56 +736,237 @@ G = Point(Gx % q, Gy % q)
 # Neutral group element
 Z = Point(0,1)
 
-# Perform a multiscalar multiplication using a simplified Pippenger algorithm
+# Below this many points, interleaved wNAF (Straus) beats bucketing
+STRAUS_THRESHOLD = 64
+
+# Width-w non-adjacent form of a nonnegative integer, least significant digit first
+def _wnaf(n,w):
+    full = 1 << w
+    half = 1 << (w-1)
+    digits = []
+    while n:
+        if n & 1:
+            digit = n & (full-1)
+            if digit >= half:
+                digit -= full
+            n -= digit
+        else:
+            digit = 0
+        digits.append(digit)
+        n >>= 1
+    return digits
+
+# Interleaved wNAF multiscalar multiplication for small inputs
+def _straus(ints,exts):
+    w = 5 if max(ints).bit_length() > 128 else 4
+
+    # odd multiples P, 3P, ..., (2**(w-1)-1)P and the additions scheduled at each bit
+    adds = []
+    for n,P in zip(ints,exts):
+        table = [P]
+        P2 = _pdbl(P)
+        for _ in range((1 << (w-2))-1):
+            table.append(_padd(table[-1],P2))
+        for i,digit in enumerate(_wnaf(n,w)):
+            if digit == 0:
+                continue
+            while len(adds) <= i:
+                adds.append([])
+            if digit > 0:
+                adds[i].append(table[digit >> 1])
+            else:
+                adds[i].append(_pneg(table[(-digit) >> 1]))
+
+    result = None
+    for i in range(len(adds)-1,-1,-1):
+        if result is not None:
+            result = _pdbl(result)
+        for P in adds[i]:
+            result = P if result is None else _padd(result,P)
+    return result
+
+# Pippenger window minimizing the estimated number of additions for n points
+def _pippenger_window(n,bits):
+    best = None
+    for c in range(2,17):
+        cost = (bits//c + 1) * (n + (1 << c)) + bits
+        if best is None or cost < best[0]:
+            best = (cost,c)
+    return best[1]
+
+# Signed-digit Pippenger multiscalar multiplication for large inputs
+def _pippenger(ints,exts):
+    bits = max(ints).bit_length()
+    c = _pippenger_window(len(ints),bits)
+    mask = (1 << c)-1
+    half = 1 << (c-1)
+    windows = bits//c + 1 # one extra window absorbs the final carry
+
+    # signed digits in [-half,half], read from integer slices
+    digits = []
+    for n in ints:
+        row = []
+        carry = 0
+        for k in range(windows):
+            digit = ((n >> (k*c)) & mask) + carry
+            if digit > half:
+                digit -= 1 << c
+                carry = 1
+            else:
+                carry = 0
+            row.append(digit)
+        digits.append(row)
+    negs = [_pneg(P) for P in exts]
+
+    result = None
+    for k in range(windows-1,-1,-1):
+        if result is not None:
+            for _ in range(c):
+                result = _pdbl(result)
+
+        buckets = [None]*(half+1)
+        for i in range(len(ints)):
+            digit = digits[i][k]
+            if digit == 0:
+                continue
+            if digit > 0:
+                P = exts[i]
+            else:
+                P = negs[i]
+                digit = -digit
+            buckets[digit] = P if buckets[digit] is None else _padd(buckets[digit],P)
+
+        # sum the buckets: sum_j j*B_j as a running sum of suffix sums
+        pail = None
+        for j in range(half,0,-1):
+            if buckets[j] is not None:
+                pail = buckets[j] if pail is None else _padd(pail,buckets[j])
+            if pail is not None:
+                result = pail if result is None else _padd(result,pail)
+    return result
+
+# Perform a multiscalar multiplication, choosing Straus or Pippenger by input size
 def multiexp(scalars,points):
     if not isinstance(scalars,ScalarVector) or not isinstance(points,PointVector):
         raise TypeError
 
     if len(scalars) != len(points):
         raise IndexError
-    if len(scalars) == 0:
+
+    ints = []
+    exts = []
+    for n,P in zip(scalars.ints,points._points):
+        if n != 0:
+            ints.append(n)
+            exts.append(P.ext)
+    if len(ints) == 0:
         return Z
 
-    buckets = None
-    result = Z # zero point
-   
-    c = 4 # window parameter; NOTE: the optimal value actually depends on len(points) empirically
-
-    # really we want to use the max bitlength to compute groups
-    maxscalar = int(max(scalars))
-    groups = 0
-    while maxscalar >= 2**groups:
-        groups += 1
-    groups = int((groups + c - 1) / c)
-    
-    # loop is really (groups-1)..0
-    for k in range(groups-1,-1,-1):
-        if result != Z:
-            for i in range(c):
-                result += result
-        
-        buckets = [Z]*(2**c) # clear all buckets
-        
-        # partition scalars into buckets
-        for i in range(len(scalars)):
-            bucket = 0
-            for j in range(c):
-                if int(scalars[i]) & (1 << (k*c+j)): # test for bit
-                    bucket |= 1 << j
-            
-            if bucket == 0: # zero bucket is never used
-                continue
-            
-            if buckets[bucket] != Z:
-                buckets[bucket] += points[i]
-            else:
-                buckets[bucket] = points[i]
-        
-        # sum the buckets
-        pail = Z
-        for i in range(len(buckets)-1,0,-1):
-            if buckets[i] != Z:
-                pail += buckets[i]
-            if pail != Z:
-                result += pail
-    return result
+    if len(ints) <= STRAUS_THRESHOLD:
+        result = _straus(ints,exts)
+    else:
+        result = _pippenger(ints,exts)
+    if result is None:
+        return Z
+    return Point._from_ext(result)
+
+# Default memory budget for fixed-base tables, in stored points
+TABLE_BUDGET = 2**16
+
+# Narrower windows than this lose to a plain multiexp, so no table is built
+TABLE_MIN_WINDOW = 5
+
+# Precomputed multiples of fixed bases: multiplication becomes table lookups plus additions
+class FixedBaseTable:
+    def __init__(self,points,budget=TABLE_BUDGET,window=None):
+        if isinstance(points,Point):
+            points = PointVector([points])
+        if not isinstance(points,PointVector):
+            raise TypeError
+        self.points = points
+        self.bits = l.bit_length()
+        if window is None:
+            window = FixedBaseTable.choose_window(len(points),budget)
+        self.window = window
+        self.tables = None
+        if window is None:
+            return
+
+        # tables[i][k][j-1] = j * 2**(window*k) * points[i] for j in 1..2**(window-1)
+        half = 1 << (window-1)
+        self.tables = []
+        for P in points._points:
+            rows = []
+            base = P.ext
+            for k in range(self.bits//window + 1):
+                row = [base]
+                for _ in range(half-1):
+                    row.append(_padd(row[-1],base))
+                rows.append(row)
+                base = _pdbl(row[-1])
+            self.tables.append(rows)
+
+    # Widest window whose signed-digit tables for count points fit in the budget, or None
+    # if it is narrower than TABLE_MIN_WINDOW
+    @staticmethod
+    def choose_window(count,budget=TABLE_BUDGET):
+        window = 0
+        for w in range(1,9):
+            if count * (l.bit_length()//w + 1) * (1 << (w-1)) <= budget:
+                window = w
+        if window < TABLE_MIN_WINDOW:
+            return None
+        return window
+
+    # Wrap previously computed tables (no recomputation)
+    @classmethod
+    def _from_tables(cls,points,window,tables):
+        result = cls.__new__(cls)
+        result.points = points
+        result.bits = l.bit_length()
+        result.window = window
+        result.tables = tables
+        return result
+
+    # Number of stored points
+    def size(self):
+        if self.tables is None:
+            return 0
+        return sum(len(row) for rows in self.tables for row in rows)
+
+    # Multiscalar multiplication against the fixed bases
+    def multiexp(self,scalars):
+        if not isinstance(scalars,ScalarVector):
+            raise TypeError
+        if len(scalars) != len(self.points):
+            raise IndexError
+        if self.tables is None:
+            return multiexp(scalars,self.points)
+
+        w = self.window
+        mask = (1 << w)-1
+        half = 1 << (w-1)
+        result = None
+        for n,rows in zip(scalars.ints,self.tables):
+            carry = 0
+            for row in rows:
+                digit = (n & mask) + carry
+                n >>= w
+                if digit > half:
+                    digit -= 1 << w
+                    carry = 1
+                else:
+                    carry = 0
+                if digit == 0:
+                    continue
+                P = row[digit-1] if digit > 0 else _pneg(row[-digit-1])
+                result = P if result is None else _padd(result,P)
+        if result is None:
+            return Z
+        return Point._from_ext(result)
+
+    # Scalar multiplication of a single fixed base
+    def mul(self,s):
+        if not isinstance(s,Scalar) or len(self.points) != 1:
+            raise TypeError
+        return self.multiexp(ScalarVector([s]))
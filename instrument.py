@@ -0,0 +1,179 @@
+# Opt-in instrumentation: operation counters and per-phase timers
+# Counters are installed by wrapping the hot functions of dumb25519, polynomial, polycommit
+# and verkle in enable(), and removed again in disable(), so disabled instrumentation costs
+# nothing.
+# The phases inside a proof or a verification are marked with phase(), which is a shared
+# no-op context manager while disabled
+#
+# usage:
+#    instrument.enable()
+#    ... build trees, prove, verify ...
+#    print(instrument.snapshot())
+
+from collections import Counter, defaultdict
+import contextlib, time
+import dumb25519
+
+enabled = False
+counters = Counter()
+timers = defaultdict(lambda: [0, 0.0])   # phase -> [calls, seconds]
+_originals = []   # (owner, name, original) of every installed wrapper
+_table_muls = 0   # FixedBaseTable.mul calls in progress
+
+
+class _NoPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_no_phase = _NoPhase()
+
+
+@contextlib.contextmanager
+def _timed(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer = timers[name]
+        timer[0] += 1
+        timer[1] += time.perf_counter() - start
+
+
+# time a phase: with instrument.phase('ipa_rounds'): ...
+def phase(name: str):
+    return _timed(name) if enabled else _no_phase
+
+
+# counters[name] += 1, and counters[name + '_terms'] += size of the first argument if sized;
+# the multiexp that FixedBaseTable.mul makes is not counted, since the mul itself is
+def _counted(function, name: str, sized: bool = False):
+    def wrapper(*args, **kwargs):
+        if sized and _table_muls:
+            return function(*args, **kwargs)
+        counters[name] += 1
+        if sized:
+            counters[name + '_terms'] += len(args[1] if isinstance(args[0], dumb25519.FixedBaseTable) else args[0])
+        return function(*args, **kwargs)
+    return wrapper
+
+
+# _counted for FixedBaseTable.mul, which marks its calls in progress
+def _counted_mul(function, name: str):
+    def wrapper(*args, **kwargs):
+        global _table_muls
+        counters[name] += 1
+        _table_muls += 1
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _table_muls -= 1
+    return wrapper
+
+
+def _phased(function, name: str):
+    def wrapper(*args, **kwargs):
+        with _timed(name):
+            return function(*args, **kwargs)
+    return wrapper
+
+
+# (owner, attribute, counter or phase name, kind); the modules that mark phases import this
+# one, so they are only imported here once instrumentation is enabled
+def _hooks() -> list:
+    import polynomial, polycommit, verkle
+    return [
+        (dumb25519, 'invert', 'inversions', 'count'),
+        (dumb25519, '_padd', 'point_adds', 'count'),
+        (dumb25519, '_pdbl', 'point_doublings', 'count'),
+        (dumb25519, '_pmul', 'scalar_mults', 'count'),
+        (dumb25519.FixedBaseTable, 'mul', 'table_scalar_mults', 'mul'),
+        (dumb25519, 'multiexp', 'multiexps', 'sized'),
+        (dumb25519.FixedBaseTable, 'multiexp', 'table_multiexps', 'sized'),
+        (dumb25519.Point, 'on_curve', 'on_curve_checks', 'count'),
+        (dumb25519, 'hash_to_scalar', 'hashes_to_scalar', 'count'),
+        (dumb25519, '_digest_to_scalar', 'hashes_to_scalar', 'count'),
+        (dumb25519, 'hash_to_point', 'hashes_to_point', 'count'),
+        (dumb25519, '_digest_to_point', 'hashes_to_point', 'count'),
+        (polynomial, 'lagrange', 'lagrange', 'phase'),
+        (polynomial.Domain, 'interpolate', 'interpolate', 'phase'),
+        (polycommit, 'commit', 'commit', 'phase'),
+        (verkle.VerkleTree, 'buildVerkleTree', 'build_tree', 'phase'),
+        (verkle.VerkleTree, 'requestData', 'request_data', 'phase'),
+        (verkle.VerkleTree, 'update_many', 'update', 'phase'),
+    ]
+
+
+def enable():
+    global enabled
+    if enabled:
+        return
+    for owner, attribute, name, kind in _hooks():
+        original = getattr(owner, attribute)
+        _originals.append((owner, attribute, original))
+        if kind == 'phase':
+            setattr(owner, attribute, _phased(original, name))
+        elif kind == 'mul':
+            setattr(owner, attribute, _counted_mul(original, name))
+        else:
+            setattr(owner, attribute, _counted(original, name, kind == 'sized'))
+    enabled = True
+
+
+def disable():
+    global enabled
+    while _originals:
+        owner, attribute, original = _originals.pop()
+        setattr(owner, attribute, original)
+    enabled = False
+
+
+def reset():
+    counters.clear()
+    timers.clear()
+
+
+# flat dict of every counter and of the calls and seconds of every phase
+def snapshot() -> dict:
+    result = dict(counters)
+    for name, (calls, seconds) in timers.items():
+        result[f'phase.{name}.calls'] = calls
+        result[f'phase.{name}.seconds'] = seconds
+    return result
+
+
+if __name__ == '__main__':
+    # use the imported module, whose state the instrumented modules see
+    import instrument
+    from verkle import VerkleTree, verifier
+
+    data = [f'block {i}' for i in range(16)]
+    instrument.enable()
+    verkledata = VerkleTree(data, 2)
+    root = verkledata.buildVerkleTree()
+    datum, proofs = verkledata.requestData(11)
+    passed = verifier(11, datum, proofs, root, verkledata.exponent, verkledata.depth, verkledata.basis_table)
+    stats = instrument.snapshot()
+    instrument.disable()
+    for name, value in sorted(stats.items()):
+        print(f'{name}: {value}')
+
+    # test: the hooks are gone after disable()
+    instrument.reset()
+    verkledata.buildVerkleTree()
+    passed &= instrument.snapshot() == {} and dumb25519._padd.__name__ == '_padd'
+    passed &= stats['multiexps'] > 0 and stats['phase.ipa_rounds.calls'] == len(proofs)
+
+    # test: a tabled scalar multiplication is counted once, not also as a table multiexp
+    instrument.enable()
+    instrument.reset()
+    dumb25519.FixedBaseTable(dumb25519.G).mul(dumb25519.random_scalar())
+    passed &= instrument.snapshot().get('table_scalar_mults') == 1 and 'table_multiexps' not in instrument.snapshot()
+    instrument.disable()
+    if passed:
+        print('The implementation of instrumentation works!')
+    else:
+        print('There\'s a problem in the implementation of instrumentation.')
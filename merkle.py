@@ -4,6 +4,7 @@
 # unoptimized
 
 from dumb25519 import Scalar, Point, ScalarVector, PointVector
+from store import TreeStore, RecordFile
 import dumb25519
 
 
@@ -12,20 +13,43 @@ class MerkleTree:
         datalength = len(datablocks)
         if datalength & (datalength - 1) != 0 or datalength == 0:   # check if not power of two
             raise ValueError('length of datablocks not a power of 2')
-        self.datablocks = datablocks
+        # updates write to the datablocks, so a list is copied rather than shared with the
+        # caller; sequences on disk (see TreeStore.blocks) are used as they are
+        self.datablocks = list(datablocks) if isinstance(datablocks, list) else datablocks
+        self.store = None
+
+    # reopen a tree saved by buildMerkleTree(store=...), without rebuilding it
+    @classmethod
+    def open(cls, store: TreeStore):
+        meta = store.load_meta()
+        tree = cls(store.blocks())
+        tree.store = store
+        tree.merkletreehashes = [store.hashes(i) for i in range(meta['levels'])]
+        return tree
 
     def hashAllBlocks(self) -> list:
-        return [dumb25519.hash_to_scalar('data', block) for block in self.datablocks]
+        return [dumb25519.hash_bytes_to_scalar('data', block) for block in self.datablocks]
 
-    def buildMerkleTree(self, printAllHash=False) -> Scalar:
-        blockhashes = self.hashAllBlocks()
+    def buildMerkleTree(self, printAllHash=False, store: TreeStore = None) -> Scalar:
+        # store: keep the datablocks and every level in memory-mapped files instead of in memory
+        # levels are built one after the other, each from the one below; with a store, and
+        # datablocks that are a sequence on disk (see TreeStore.blocks), the tree never has
+        # to fit in memory
+        if store is not None:
+            self.store = store
+            self.datablocks = store.blocks(self.datablocks)
+        blockhashes = self._newLevel(0, len(self.datablocks))
+        for i, block in enumerate(self.datablocks):
+            blockhashes[i] = dumb25519.hash_bytes_to_scalar('data', block)
         self.merkletreehashes = [blockhashes]
         while len(blockhashes) > 1:
-            cache = []
-            for i in range(0, len(blockhashes), 2):
-                cache.append(dumb25519.hash_to_scalar('merkle', blockhashes[i], blockhashes[i + 1]))
+            cache = self._newLevel(len(self.merkletreehashes), len(blockhashes) // 2)
+            for i in range(len(cache)):
+                cache[i] = dumb25519.hash_bytes_to_scalar('merkle', blockhashes[2 * i], blockhashes[2 * i + 1])
             self.merkletreehashes.append(cache)
             blockhashes = cache
+        if self.store is not None:
+            self.store.save_meta({'levels': len(self.merkletreehashes), 'block_size': self.datablocks.record_size})
 
         if printAllHash == True:
             for i, hashes in enumerate(self.merkletreehashes):
@@ -33,6 +57,12 @@ class MerkleTree:
 
         return blockhashes[0]   # return merkle tree root
 
+    # a new level of count hashes, in memory or in a new record file of self.store
+    def _newLevel(self, level: int, count: int) -> list:
+        if self.store is None:
+            return [None] * count
+        return self.store.hashes(level, count)
+
     def requestData(self, index: int) -> tuple:
         # note: in some implementations, self.merkletreehashes is not stored, unlike
         # in here. in those cases, when datum is requested, the whole merkle tree is
@@ -50,19 +80,193 @@ class MerkleTree:
             index >>= 1
         return datum, hashes
 
+    def update(self, index: int, block: object) -> Scalar:
+        return self.update_many({index: block})
+
+    def update_many(self, changes: dict) -> Scalar:
+        # rehash only the paths from the changed blocks to the root; paths that meet are
+        # merged, so every dirty node is hashed once per batch
+        num_blocks = len(self.datablocks)
+        for index in changes:
+            if not(0 <= index < num_blocks):
+                raise ValueError(f'index must be in range({num_blocks})')
+
+        # every change is hashed and checked to fit its record before any is written, so that
+        # a bad change leaves the tree as it was
+        leaves = {}
+        for index, block in changes.items():
+            if isinstance(self.datablocks, RecordFile):
+                self.datablocks.check(block)
+            leaves[index] = dumb25519.hash_bytes_to_scalar('data', block)
+        for index, block in changes.items():
+            self.datablocks[index] = block
+            self.merkletreehashes[0][index] = leaves[index]
+        dirty = set(changes)
+        for i in range(1, len(self.merkletreehashes)):
+            dirty = set(index >> 1 for index in dirty)
+            for index in dirty:
+                self.merkletreehashes[i][index] = dumb25519.hash_bytes_to_scalar(
+                    'merkle', self.merkletreehashes[i - 1][2 * index], self.merkletreehashes[i - 1][2 * index + 1])
+        return self.merkletreehashes[-1][0]   # return merkle tree root
+
+    def requestMany(self, indices: list) -> tuple:
+        # one multiproof for all indices: level by level, only the siblings that the
+        # verifier cannot compute from the requested data are sent, in ascending order
+        num_blocks = len(self.datablocks)
+        for index in indices:
+            if not(0 <= index < num_blocks):
+                raise ValueError(f'index must be in range({num_blocks})')
+
+        data = [self.datablocks[index] for index in indices]
+        hashes = []
+        known = sorted(set(indices))
+        for i in range(len(self.merkletreehashes) - 1):
+            known_set = set(known)
+            hashes.extend(self.merkletreehashes[i][index ^ 1] for index in known if index ^ 1 not in known_set)
+            known = sorted(set(index >> 1 for index in known))
+        return data, {'hashes': hashes}
+
+
+# Merkle tree built from a stream of blocks, holding only the pending subtree roots (one per
+# height, so O(log n)) instead of every level. with a store, every level is also written to
+# the record files of the store, in the layout of MerkleTree (hashes0 holds the block hashes),
+# from which requestHashes serves proofs, also after the store is reopened with open()
+class StreamingMerkleTree:
+    def __init__(self, store: TreeStore = None):
+        self.store = store
+        self.num_blocks = 0
+        self.depth = 0
+        self.root = None
+        self.levels = []
+
+    # reopen a tree saved by buildMerkleTree, to serve proofs without rebuilding it
+    @classmethod
+    def open(cls, store: TreeStore):
+        meta = store.load_meta()
+        tree = cls(store)
+        tree.num_blocks = meta['num_blocks']
+        tree.depth = meta['levels'] - 1
+        tree.levels = [store.hashes(i) for i in range(meta['levels'])]
+        tree.root = tree.levels[-1][0]
+        return tree
+
+    # blocks: any iterable of blocks, e.g. read_blocks(path, size) for a file
+    # num_blocks: number of blocks (default: len(blocks)); required with a store, so that a
+    # number of blocks that is not a power of 2 is rejected before anything is written
+    def buildMerkleTree(self, blocks, num_blocks: int = None) -> Scalar:
+        if num_blocks is None and hasattr(blocks, '__len__'):
+            num_blocks = len(blocks)
+        if num_blocks is None and self.store is not None:
+            raise ValueError('number of blocks needed to write the levels to a store')
+        if num_blocks is not None and (num_blocks & (num_blocks - 1) != 0 or num_blocks == 0):   # check if not power of two
+            raise ValueError('length of datablocks not a power of 2')
+        levels = []
+        if self.store is not None:
+            levels = [self.store.hashes(i, num_blocks >> i) for i in range(num_blocks.bit_length())]
+
+        frontier = []   # frontier[h]: root of a pending subtree of height h, or None
+        count = 0
+        for block in blocks:
+            if count == num_blocks:
+                raise ValueError('more blocks than num_blocks')
+            count += 1
+            curr = dumb25519.hash_bytes_to_scalar('data', block)
+            height = 0
+            while True:
+                if levels:
+                    levels[height][(count - 1) >> height] = curr
+                if height == len(frontier):
+                    frontier.append(None)
+                if frontier[height] is None:
+                    frontier[height] = curr
+                    break
+                curr = dumb25519.hash_bytes_to_scalar('merkle', frontier[height], curr)
+                frontier[height] = None
+                height += 1
+
+        if count & (count - 1) != 0 or count == 0:   # check if not power of two
+            raise ValueError('length of datablocks not a power of 2')
+        if num_blocks is not None and count != num_blocks:
+            raise ValueError('fewer blocks than num_blocks')
+        self.num_blocks = count
+        self.depth = len(frontier) - 1
+        self.root = frontier[-1]
+        self.levels = levels
+        if self.store is not None:
+            self.store.save_meta({'levels': len(levels), 'num_blocks': count})
+        return self.root   # return merkle tree root
+
+    # sibling hashes of a block, read from the levels in the store; see verifier
+    def requestHashes(self, index: int) -> list:
+        if not self.levels:
+            raise ValueError('levels were not written to a store')
+        if not(0 <= index < self.num_blocks):
+            raise ValueError(f'index must be in range({self.num_blocks})')
+        hashes = []
+        for i in range(self.depth):
+            hashes.append(self.levels[i][index ^ 1])
+            index >>= 1
+        return hashes
+
+
+# blocks of a file, block_size bytes each (the last one may be shorter)
+def read_blocks(path: str, block_size: int):
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                return
+            yield block
+
 
 def verifier(index: int, datum: object, hashes: list, root: Scalar) -> bool:
-    curr = dumb25519.hash_to_scalar('data', datum)
+    curr = dumb25519.hash_bytes_to_scalar('data', datum)
     for hash in hashes:
         hash_index = index ^ 1
         if hash_index > index:
-            curr = dumb25519.hash_to_scalar('merkle', curr, hash)
+            curr = dumb25519.hash_bytes_to_scalar('merkle', curr, hash)
         else:
-            curr = dumb25519.hash_to_scalar('merkle', hash, curr)
+            curr = dumb25519.hash_bytes_to_scalar('merkle', hash, curr)
         index >>= 1
     return curr == root
 
 
+# rebuild the root from all requested data and the multiproof in one bottom-up pass
+# depth is that of the verifier's tree, which has 2 ** depth blocks, never the prover's
+def verifier_many(indices: list, data: list, proof: dict, root: Scalar, depth: int) -> bool:
+    if len(indices) == 0 or len(indices) != len(data):
+        return False
+    if not isinstance(proof, dict) or not isinstance(proof.get('hashes'), list):
+        return False
+    if not all(isinstance(hash, Scalar) for hash in proof['hashes']):
+        return False
+    level = {}
+    for index, datum in zip(indices, data):
+        if not(0 <= index < 1 << depth):
+            return False
+        curr = dumb25519.hash_bytes_to_scalar('data', datum)
+        if level.setdefault(index, curr) != curr:   # conflicting data for the same index
+            return False
+
+    hashes = iter(proof['hashes'])
+    for i in range(depth):
+        parents = {}
+        for index in sorted(level):
+            if index >> 1 in parents:
+                continue
+            sibling = level.get(index ^ 1)
+            if sibling is None:
+                sibling = next(hashes, None)
+                if sibling is None:   # too few hashes
+                    return False
+            if index & 1 == 0:
+                parents[index >> 1] = dumb25519.hash_bytes_to_scalar('merkle', level[index], sibling)
+            else:
+                parents[index >> 1] = dumb25519.hash_bytes_to_scalar('merkle', sibling, level[index])
+        level = parents
+    return next(hashes, None) is None and level[0] == root
+
+
 if __name__ == '__main__':
     # len(data) should be a power of 2
     # source: https://www.random.org/strings/
@@ -79,4 +283,46 @@ if __name__ == '__main__':
     if verifier(11, datum, hashes, root):
         print('\nProvided hashes are correct!')
     else:
-        print('\nProvided hashes are wrong!')
\ No newline at end of file
+        print('\nProvided hashes are wrong!')
+
+    # one multiproof for several data requests
+    indices = [2, 3, 11, 12]
+    data_many, multiproof = merkledata.requestMany(indices)
+    print(f'data{indices}: {data_many}')
+    print(f'provided hashes: {multiproof["hashes"]}')
+    if verifier_many(indices, data_many, multiproof, root, len(merkledata.merkletreehashes) - 1):
+        print('\nProvided multiproof is correct!')
+    else:
+        print('\nProvided multiproof is wrong!')
+
+    # update datablocks without rebuilding the tree
+    root = merkledata.update_many({11: 'updated', 12: 'updated too'})
+    datum, hashes = merkledata.requestData(11)
+    if verifier(11, datum, hashes, root) and root == MerkleTree(merkledata.datablocks).buildMerkleTree():
+        print('\nProvided hashes after update are correct!')
+    else:
+        print('\nProvided hashes after update are wrong!')
+
+    # the updated tree, built from a stream of its blocks and served from disk, also after reopening
+    import tempfile
+    store = TreeStore(tempfile.mkdtemp())
+    streamingdata = StreamingMerkleTree(store)
+    passed = streamingdata.buildMerkleTree(iter(merkledata.datablocks), len(data)) == root
+    passed &= streamingdata.requestHashes(11) == merkledata.requestData(11)[1]
+    passed &= StreamingMerkleTree.open(store).requestHashes(11) == merkledata.requestData(11)[1]
+    if passed:
+        print('\nStreaming build is correct!')
+    else:
+        print('\nStreaming build is wrong!')
+
+    # keep the tree in memory-mapped files, and reopen it without rebuilding
+    store = TreeStore(tempfile.mkdtemp())
+    root = MerkleTree(data).buildMerkleTree(store=store)
+    merkledata = MerkleTree.open(store)
+    passed = verifier(11, *merkledata.requestData(11), root)
+    root = merkledata.update(11, 'updated')   # written through to the files
+    passed &= verifier(11, *MerkleTree.open(store).requestData(11), root)
+    if passed:
+        print('\nProvided hashes from a reopened tree are correct!')
+    else:
+        print('\nProvided hashes from a reopened tree are wrong!')
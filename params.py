@@ -0,0 +1,310 @@
+# Public parameters (CRS) shared by prover and verifier
+# Generators are derived deterministically by index, so every party can regenerate them.
+# They can also be saved, together with the Lagrange basis points, the domain's basis
+# polynomials and the fixed-base tables, to a file of fixed-width records that is
+# memory-mapped on load, so nothing has to be recomputed at startup.
+# The id only covers the generators, so everything derived from them is checked on load:
+# the basis points and polynomials with one random combination, the tables entry by entry
+# when first used. A caller that pins the checksum of a file it trusts (returned by save)
+# skips these checks, and only decodes what it reads
+#
+# unoptimized
+
+from dumb25519 import Scalar, Point, ScalarVector, PointVector
+from hashlib import blake2s
+import mmap, struct
+import dumb25519, polycommit, polynomial
+
+MAGIC = b'VKPP'
+VERSION = 1
+_HEADER = struct.Struct('<4sBIB32s32sH')   # magic, version, width, flags, id, body checksum, seed length
+_FLAG_TABLES = 1
+_POINT_SIZE = 64   # affine x and y, so that loading needs no square roots
+_SCALAR_SIZE = 32
+FORMS = ('coeff', 'eval')
+
+_registry = {}   # id -> PublicParams generated or loaded in this process
+_generated = {}   # (width, seed) -> PublicParams
+
+
+class PublicParams:
+    def __init__(self, width: int, seed: bytes = b'verklebp', G_vec: PointVector = None):
+        if width & (width - 1) != 0 or width <= 1:   # check if not power of two
+            raise ValueError('width not a power of 2 or less than 2')
+        if G_vec is None:
+            G_vec = PointVector([dumb25519.hash_bytes_to_point('generator', seed, i.to_bytes(4, 'little'))
+                                 for i in range(width)])
+        if len(G_vec) != width:
+            raise ValueError('length of G_vec does not match width')
+        self.width = width
+        self.seed = seed
+        self.G_vec = G_vec
+        self.H = polycommit.H
+        self.id = _params_id(width, G_vec)
+        self._L_vec = None
+        self._tables = {}   # (form, window) -> FixedBaseTable
+        self._saved_tables = {}   # form -> (window, offset) of a table in self._mmap, decoded on first use
+        self._mmap = None
+        self._pinned = False   # whether self._mmap is a file the caller trusts, whose tables are not checked
+        _registry.setdefault(self.id, self)   # parameters of the same id have the same generators
+
+    # deterministic parameters for a width, generated once per process
+    @classmethod
+    def get(cls, width: int, seed: bytes = b'verklebp'):
+        if (width, seed) not in _generated:
+            _generated[(width, seed)] = cls(width, seed)
+        return _generated[(width, seed)]
+
+    # Lagrange basis points L_i(G) for the domain 1..width
+    @property
+    def L_vec(self) -> PointVector:
+        if self._L_vec is None:
+            self._L_vec = polycommit.lagrange_basis(self.G_vec)
+        return self._L_vec
+
+    # commitment basis for a form ('coeff' or 'eval', see polycommit.evaluation_vector)
+    def basis(self, form: str) -> PointVector:
+        if form == 'coeff':
+            return self.G_vec
+        if form == 'eval':
+            return self.L_vec
+        raise ValueError(f'unknown commitment form {form!r}')
+
+    # fixed-base table of the commitment basis for a form, of at most budget points (see
+    # dumb25519.FixedBaseTable); a saved table is used if it has the window of the budget
+    def table(self, form: str, budget: int = dumb25519.TABLE_BUDGET) -> dumb25519.FixedBaseTable:
+        window = dumb25519.FixedBaseTable.choose_window(self.width, budget)
+        if (form, window) not in self._tables:
+            basis = self.basis(form)
+            if form in self._saved_tables and self._saved_tables[form][0] == window:
+                window, offset = self._saved_tables.pop(form)
+                self._tables[(form, window)] = _read_table(self._mmap, offset, basis, window, not self._pinned)
+            else:
+                self._tables[(form, window)] = dumb25519.FixedBaseTable(basis, budget)
+        return self._tables[(form, window)]
+
+    # write the parameters as fixed-width records:
+    # header, G_vec, L_vec, Lagrange basis coefficients, then optionally one table per form
+    # returns the checksum of the file, which load(path, checksum) trusts
+    #    * budget: the budget of the saved tables, as in table()
+    def save(self, path: str, tables: bool = True, budget: int = dumb25519.TABLE_BUDGET) -> bytes:
+        body = [_write_points([P.ext for P in self.G_vec.points]), _write_points([P.ext for P in self.L_vec.points])]
+        for basis in polynomial.domain(self.width).basis():
+            body.append(b''.join(x.to_bytes(_SCALAR_SIZE, 'little') for x in basis.ints))
+        if tables:
+            for form in FORMS:
+                table = self.table(form, budget)
+                body.append(struct.pack('<B', table.window or 0))
+                if table.window:
+                    body.append(_write_points([P for rows in table.tables for row in rows for P in row]))
+        body = b''.join(body)
+        checksum = blake2s(body).digest()
+        header = _HEADER.pack(MAGIC, VERSION, self.width, _FLAG_TABLES if tables else 0, self.id, checksum, len(self.seed))
+        with open(path, 'wb') as f:
+            f.write(header + self.seed + body)
+        return checksum
+
+    # map a saved file; tables stay in the mapping until they are first used
+    # the parameters are registered by id only once they are checked, and never replace the
+    # deterministic ones of get(): a file may hold any generators, so they are used only
+    # where they are passed explicitly, e.g. VerkleTree(params=...)
+    #    * checksum: the checksum of a file the caller trusts, as returned by save(); everything
+    #      derived from the generators is then taken from the file as it is
+    @classmethod
+    def load(cls, path: str, checksum: bytes = None):
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, width, flags, params_id, body_checksum, seed_len = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('not a parameter file of a supported version')
+        if checksum is not None and checksum != body_checksum:
+            raise ValueError('parameter file is not the trusted one')
+        offset = _HEADER.size
+        seed = bytes(data[offset:offset + seed_len])
+        offset += seed_len
+        if blake2s(data[offset:]).digest() != body_checksum:
+            raise ValueError('parameter file is corrupted')
+
+        G_vec, offset = _read_points(data, offset, width)
+        if _params_id(width, G_vec) != params_id:
+            raise ValueError('parameter file does not match its id')
+        L_vec, offset = _read_points(data, offset, width)
+
+        # install the Lagrange basis polynomials into the memoized domain, once they are checked
+        domain = polynomial.domain(width)
+        basis = []
+        for i in range(width):
+            basis.append(ScalarVector._from_ints([int.from_bytes(data[offset + k * _SCALAR_SIZE:offset + (k + 1) * _SCALAR_SIZE], 'little')
+                                                  for k in range(width)]))
+            offset += width * _SCALAR_SIZE
+        if checksum is None:
+            _check_lagrange(G_vec, L_vec, basis)
+        if domain._basis is None:
+            domain._basis = basis
+
+        params = cls(width, seed, G_vec)
+        params._L_vec = L_vec
+        if flags & _FLAG_TABLES:
+            for form in FORMS:
+                window = data[offset]
+                offset += 1
+                if window:
+                    params._saved_tables[form] = (window, offset)
+                    offset += _table_size(width, window) * _POINT_SIZE
+        params._mmap = data
+        params._pinned = checksum is not None
+        return params
+
+
+# id of parameters: a digest of their width and generators
+def _params_id(width: int, G_vec: PointVector) -> bytes:
+    return blake2s(b'verklebp params' + width.to_bytes(4, 'little') + G_vec.digest() + polycommit.H.to_bytes()).digest()
+
+
+# parameters generated or loaded in this process, by id
+def lookup(params_id: bytes) -> PublicParams:
+    if params_id not in _registry:
+        raise KeyError('unknown public parameters')
+    return _registry[params_id]
+
+
+# parameters whose commitment basis for a form is basis, so that it can be referred to by id
+def find(basis: PointVector, form: str) -> PublicParams:
+    for params in _registry.values():
+        if params.width == len(basis) and (params.basis(form) is basis or params.basis(form).digest() == basis.digest()):
+            return params
+    raise KeyError('basis does not belong to known public parameters')
+
+
+# number of points in a signed-digit table (see dumb25519.FixedBaseTable)
+def _table_size(width: int, window: int) -> int:
+    return width * (dumb25519.l.bit_length() // window + 1) * (1 << (window - 1))
+
+
+# affine records of extended coordinates, normalized with a single batched inversion
+def _write_points(exts: list) -> bytes:
+    q = dumb25519.q
+    prefix = []
+    acc = 1
+    for P in exts:
+        prefix.append(acc)
+        acc = acc * P[2] % q
+    inv = dumb25519.invert(acc, q)
+    records = [b''] * len(exts)
+    for i in range(len(exts) - 1, -1, -1):
+        X, Y, Z, T = exts[i]
+        z_inv = inv * prefix[i] % q
+        inv = inv * Z % q
+        records[i] = (X * z_inv % q).to_bytes(32, 'little') + (Y * z_inv % q).to_bytes(32, 'little')
+    return b''.join(records)
+
+
+def _read_ext(data, offset: int) -> tuple:
+    x = int.from_bytes(data[offset:offset + 32], 'little')
+    y = int.from_bytes(data[offset + 32:offset + 64], 'little')
+    return (x, y, 1, x * y % dumb25519.q)
+
+
+def _read_points(data, offset: int, count: int) -> tuple:
+    points = []
+    for i in range(count):
+        P = Point._from_ext(_read_ext(data, offset))
+        if not P.on_curve():
+            raise ValueError('parameter file holds a point not on the curve')
+        points.append(P)
+        offset += _POINT_SIZE
+    return PointVector(points), offset
+
+
+# check basis polynomials and Lagrange basis points read from a file: for random weights w_vec,
+# B = sum w_i * basis_i must take the value w_j at the domain point j + 1, and
+# w_vec ** L_vec must equal B ** G_vec
+def _check_lagrange(G_vec: PointVector, L_vec: PointVector, basis: list):
+    width = len(G_vec)
+    w_vec = ScalarVector([dumb25519.random_scalar() for i in range(width)])
+    B = [0 for k in range(width)]
+    for w, poly in zip(w_vec.ints, basis):
+        if max(poly.ints) >= dumb25519.l:
+            raise ValueError('parameter file holds a non-canonical scalar')
+        B = [(b + w * c) % dumb25519.l for b, c in zip(B, poly.ints)]
+    B = ScalarVector._from_ints(B)
+    for j in range(width):
+        if polynomial.poly_eval(Scalar(j + 1), B) != w_vec[j]:
+            raise ValueError('parameter file holds wrong basis polynomials')
+    if w_vec ** L_vec != B ** G_vec:
+        raise ValueError('parameter file holds wrong Lagrange basis points')
+
+
+# whether R = P + Q, for affine extended points on the curve (the addition law is complete, so
+# R is unique); dT_Q is d * Q[3] % q, shared by all the sums with the same Q
+def _is_sum(P: tuple, Q: tuple, R: tuple, dT_Q: int) -> bool:
+    q = dumb25519.q
+    t = dT_Q * P[3] % q
+    return ((R[0] * (1 + t) - P[0] * Q[1] - P[1] * Q[0]) % q == 0 and
+            (R[1] * (1 - t) - P[1] * Q[1] - P[0] * Q[0]) % q == 0)
+
+
+# whether a row of a saved table is right for its basis point P: the first row starts at P,
+# every entry is the previous one plus the first of its row, and every row starts at twice
+# the last entry of the row before (previous, None for the first row)
+def _valid_row(row: list, previous: list, P: Point) -> bool:
+    if previous is None:
+        valid = row[0][:2] == (P.x, P.y)
+    else:
+        last = previous[-1]
+        valid = _is_sum(last, last, row[0], dumb25519.d * last[3] % dumb25519.q)
+    dT = dumb25519.d * row[0][3] % dumb25519.q
+    return valid and all(_is_sum(row[j - 1], row[0], row[j], dT) for j in range(1, len(row)))
+
+
+# a saved table, checked row by row against its basis points unless check is False
+def _read_table(data, offset: int, basis: PointVector, window: int, check: bool = True) -> dumb25519.FixedBaseTable:
+    half = 1 << (window - 1)
+    tables = []
+    for i in range(len(basis)):
+        rows = []
+        for k in range(dumb25519.l.bit_length() // window + 1):
+            row = [_read_ext(data, offset + j * _POINT_SIZE) for j in range(half)]
+            offset += half * _POINT_SIZE
+            if check and not _valid_row(row, rows[-1] if rows else None, basis[i]):
+                raise ValueError('parameter file holds a wrong fixed-base table')
+            rows.append(row)
+        tables.append(rows)
+    return dumb25519.FixedBaseTable._from_tables(basis, window, tables)
+
+
+if __name__ == '__main__':
+    import os, tempfile, time
+
+    params = PublicParams.get(4)
+    path = os.path.join(tempfile.mkdtemp(), 'params.bin')
+    checksum = params.save(path)
+    start = time.time()
+    loaded = PublicParams.load(path)
+    elapsed = time.time() - start
+    print(f'Loaded {os.path.getsize(path)} bytes of parameters in {elapsed * 1000:.1f} ms')
+    start = time.time()
+    pinned = PublicParams.load(path, checksum)
+    pinned.table('coeff')
+    elapsed = time.time() - start
+    print(f'Loaded trusted parameters and a table in {elapsed * 1000:.1f} ms')
+
+    # test: the loaded parameters commit exactly like the generated ones, checked or trusted
+    a_vec = ScalarVector([dumb25519.random_scalar() for i in range(4)])
+    r = dumb25519.random_scalar()
+    passed = loaded.id == params.id and loaded.G_vec == params.G_vec and loaded.L_vec == params.L_vec
+    for form in FORMS:
+        for public in (loaded, pinned):
+            passed &= (polycommit.commit(public.basis(form), a_vec, r, public.table(form)) ==
+                       polycommit.commit(params.basis(form), a_vec, r, params.table(form)))
+
+    # test: a file is not taken as trusted under another checksum
+    try:
+        PublicParams.load(path, bytes(32))
+        passed = False
+    except ValueError:
+        pass
+    if passed:
+        print('The implementation of public parameters works!')
+    else:
+        print('There\'s a problem in the implementation of public parameters.')
@@ -5,21 +5,85 @@
 # unoptimized
 
 from dumb25519 import Scalar, Point, ScalarVector, PointVector
-from polynomial import powers, poly_eval
-import dumb25519
+from polynomial import powers, poly_eval, poly_div_linear
+from transcript import Transcript
+import dumb25519, instrument, polynomial
 
 H = dumb25519.hash_to_point('H')
+H_table = dumb25519.FixedBaseTable(H)   # blinding terms become table lookups
 
 
-def prove(G_vec: PointVector, P: Point, x: Scalar, v: Scalar, a_vec: ScalarVector, r: Scalar) -> dict:
+# commitment P = a_vec ** G_vec + r * H, optionally with a precomputed table for G_vec
+def commit(G_vec: PointVector, a_vec: ScalarVector, r: Scalar, G_table: dumb25519.FixedBaseTable = None) -> Point:
+    if G_table is None:
+        return a_vec ** G_vec + H_table.mul(r)
+    return G_table.multiexp(a_vec) + H_table.mul(r)
+
+
+# expand the challenges u_vec (index j is reversed) into s_vec, where s_vec[i] is the product
+# over j of u_vec[j] if bit (len(u_vec) - 1 - j) of i is set and of u_vec[j] ** -1 otherwise
+# all challenges are inverted at once, then s_vec is built by doubling in O(n) multiplications
+#    * u_vec_inv: the inverses of u_vec, if already known
+def challenge_expansion(u_vec: ScalarVector, u_vec_inv: ScalarVector = None) -> tuple:
+    if u_vec_inv is None:
+        u_vec_inv = u_vec.invert()
+    s_vec = [1]
+    for j in range(len(u_vec) - 1, -1, -1):   # reverse: u_vec[0] is the most significant bit
+        u_j = u_vec.ints[j]
+        u_j_inv = u_vec_inv.ints[j]
+        s_vec = [s * u_j_inv % dumb25519.l for s in s_vec] + [s * u_j % dumb25519.l for s in s_vec]
+    return u_vec_inv, ScalarVector._from_ints(s_vec)
+
+
+# b_vec such that a_vec ** b_vec is the evaluation at x, for a commitment form:
+#    * 'coeff': a_vec holds coefficients over G_vec; b_vec = powers of x
+#    * 'eval': a_vec holds evaluations on polynomial.domain(dlen) over the Lagrange
+#      basis points L_i(G_vec); b_vec = Lagrange coefficients at x
+def evaluation_vector(form: str, x: Scalar, dlen: int) -> ScalarVector:
+    if form == 'coeff':
+        return powers(x, dlen - 1)
+    if form == 'eval':
+        return polynomial.domain(dlen).lagrange_coeffs(x)
+    raise ValueError(f'unknown commitment form {form!r}')
+
+
+# Lagrange basis points L_i(G_vec) = basis_i ** G_vec, for committing in 'eval' form
+def lagrange_basis(G_vec: PointVector) -> PointVector:
+    return PointVector([basis ** G_vec for basis in polynomial.domain(len(G_vec)).basis()])
+
+
+# Fiat-Shamir transcript of an opening proof; G_vec is absorbed through its cached digest
+def _ipa_transcript(form: str, P: Point, x: Scalar, v: Scalar, G_vec: PointVector, hiding: bool = True) -> Transcript:
+    transcript = Transcript('IPA' if hiding else 'IPA non-hiding')
+    transcript.append('statement', form, P, x, v, G_vec.digest())
+    return transcript
+
+
+# g_vec ** G_vec, through G_table when one is given
+def _generator_multiexp(G_vec: PointVector, g_vec: ScalarVector, G_table: dumb25519.FixedBaseTable = None) -> Point:
+    if G_table is None:
+        return g_vec ** G_vec
+    return G_table.multiexp(g_vec)
+
+
+# hiding=False drops the blinding factors and the zero knowledge opening, and sends the
+# final folded a instead; P must then be an unblinded commitment (r = 0)
+# the folded generators are never built: G_prm[i] = sum_t c_t * G_vec[i + t * len(G_prm)],
+# where c_vec is the challenge expansion of the rounds so far, so L_j and R_j are multiexps
+# over G_vec itself (or lookups in G_table) and only a_prm and b_prm are folded
+def prove(G_vec: PointVector, P: Point, x: Scalar, v: Scalar, a_vec: ScalarVector, r: Scalar, form: str = 'coeff',
+          hiding: bool = True, G_table: dumb25519.FixedBaseTable = None) -> dict:
     dlen = len(a_vec)
     if dlen & (dlen - 1) != 0 or dlen <= 1:   # check if not power of two
         raise ValueError('length of polynomial not a power of 2 or less than 2')
+    if not hiding and r != Scalar(0):
+        raise ValueError('non-hiding proof of a blinded commitment')
 
     # build statement and P_prm
-    b_vec = powers(x, dlen - 1)
+    b_vec = evaluation_vector(form, x, dlen)
     statement = [P, x, v, G_vec]
-    U = dumb25519.hash_to_point('U Fiat-Shamir hash', *statement)
+    transcript = _ipa_transcript(form, *statement, hiding)
+    U = transcript.challenge_point('U')
     P_prm = P + v * U
 
     # build L and R (index j is reversed)
@@ -28,85 +92,374 @@ def prove(G_vec: PointVector, P: Point, x: Scalar, v: Scalar, a_vec: ScalarVecto
     l_vec = ScalarVector()
     r_vec = ScalarVector()
     u_vec = ScalarVector()
+    u_vec_inv = ScalarVector()
 
     splt = dlen   # vector splitter (the lo & hi subscripts from paper)
-    G_prm = G_vec
+    c_vec = ScalarVector._from_ints([1])   # coefficients of G_prm over G_vec
     a_prm = a_vec
     b_prm = b_vec
 
-    while splt > 1:
-        splt //= 2   # split in half evenly
-        l_j = dumb25519.random_scalar()   # blinding factor
-        r_j = dumb25519.random_scalar()   # blinding factor
-        L_j = a_prm[:splt] ** G_prm[splt:] + l_j * H + (a_prm[:splt] ** b_prm[splt:]) * U
-        R_j = a_prm[splt:] ** G_prm[:splt] + r_j * H + (a_prm[splt:] ** b_prm[:splt]) * U
-        l_vec.append(l_j)
-        r_vec.append(r_j)
-        L_vec.append(L_j)
-        R_vec.append(R_j)
-        u_j = dumb25519.hash_to_scalar('LR Fiat-Shamir hash', *statement, L_j, R_j)
-        u_vec.append(u_j)
-        a_prm = a_prm[splt:] * u_j.invert() + a_prm[:splt] * u_j
-        b_prm = b_prm[:splt] * u_j.invert() + b_prm[splt:] * u_j
-        G_prm = G_prm[:splt] * u_j.invert() + G_prm[splt:] * u_j
+    with instrument.phase('ipa_rounds'):
+        while splt > 1:
+            splt //= 2   # split in half evenly
+            # a_lo ** G_prm_hi and a_hi ** G_prm_lo as scalar vectors over G_vec
+            g_L = [0 for i in range(dlen)]
+            g_R = [0 for i in range(dlen)]
+            for t, c in enumerate(c_vec.ints):
+                base = 2 * splt * t
+                g_L[base + splt:base + 2 * splt] = [c * a % dumb25519.l for a in a_prm.ints[:splt]]
+                g_R[base:base + splt] = [c * a % dumb25519.l for a in a_prm.ints[splt:]]
+            L_j = _generator_multiexp(G_vec, ScalarVector._from_ints(g_L), G_table) + (a_prm[:splt] ** b_prm[splt:]) * U
+            R_j = _generator_multiexp(G_vec, ScalarVector._from_ints(g_R), G_table) + (a_prm[splt:] ** b_prm[:splt]) * U
+            if hiding:
+                l_j = dumb25519.random_scalar()   # blinding factor
+                r_j = dumb25519.random_scalar()   # blinding factor
+                L_j += H_table.mul(l_j)
+                R_j += H_table.mul(r_j)
+                l_vec.append(l_j)
+                r_vec.append(r_j)
+            L_vec.append(L_j)
+            R_vec.append(R_j)
+            transcript.append('LR', L_j, R_j)
+            u_j = transcript.challenge_scalar('u')
+            u_vec.append(u_j)
+            u_j_inv = u_j.invert()   # the only inversion per round
+            u_vec_inv.append(u_j_inv)
+            a_prm = a_prm.fold(u_j, u_j_inv)   # a_lo * u_j + a_hi * u_j^-1 in one pass
+            b_prm = b_prm.fold(u_j_inv, u_j)
+            c_vec = challenge_expansion(u_vec, u_vec_inv)[1]   # the s_vec of the verifier, so far
+
+        # the folded generator, G = s_vec ** G_vec
+        G = _generator_multiexp(G_vec, c_vec, G_table)
+    if not hiding:
+        return {'state': statement, 'form': form, 'L': L_vec, 'R': R_vec, 'a': a_prm[0], 'G': G}
 
     # zero knowledge opening (Equation 2 from paper)
-    u_vec_sqrd = u_vec * u_vec
-    r_prm = l_vec ** u_vec_sqrd + r + r_vec ** u_vec_sqrd.invert()
-    Q = a_prm[0] * (G_prm[0] + b_prm[0] * U) + r_prm * H
-    d = dumb25519.random_scalar()   # blinding factor
-    s = dumb25519.random_scalar()   # blinding factor
-    R = d * (G_prm[0] + b_prm[0] * U) + s * H
-    c = dumb25519.hash_to_scalar('ZKopen Fiat-Shamir hash', Q, R)
-    z1 = a_prm[0] * c + d
-    z2 = c * r_prm + s
-    zkopen = [R, z1, z2]
-
-    return {'state': statement, 'L': L_vec, 'R': R_vec, 'zkopen': zkopen}
-
-
-def verify(proof: dict) -> bool:
-    # build u_vec (index j is reversed)
-    L_vec = proof['L']
-    R_vec = proof['R']
+    with instrument.phase('zk_open'):
+        r_prm = l_vec ** (u_vec * u_vec) + r + r_vec ** (u_vec_inv * u_vec_inv)
+        Q = a_prm[0] * (G + b_prm[0] * U) + H_table.mul(r_prm)
+        d = dumb25519.random_scalar()   # blinding factor
+        s = dumb25519.random_scalar()   # blinding factor
+        R = d * (G + b_prm[0] * U) + H_table.mul(s)
+        transcript.append('ZKopen', R)
+        c = transcript.challenge_scalar('c')
+        z1 = a_prm[0] * c + d
+        z2 = c * r_prm + s
+        zkopen = [R, z1, z2]
+
+    # G is sent along for verifiers that defer it (see Accumulator)
+    return {'state': statement, 'form': form, 'L': L_vec, 'R': R_vec, 'zkopen': zkopen, 'G': G}
+
+
+# whether a proof has the shape of an opening proof: a statement (P, x, v, G_vec) whose G_vec
+# has a power of 2 length, one (L_j, R_j) per round and the opening of its kind, so that
+# verifiers return False on malformed proofs instead of raising
+def well_formed(proof: dict) -> bool:
+    try:
+        P, x, v, G_vec = proof['state']
+        if not(isinstance(P, Point) and isinstance(x, Scalar) and isinstance(v, Scalar) and isinstance(G_vec, PointVector)):
+            return False
+        dlen = len(G_vec)
+        if dlen & (dlen - 1) != 0 or dlen <= 1:   # check if not power of two
+            return False
+        rounds = dlen.bit_length() - 1
+        L_vec, R_vec = proof['L'], proof['R']
+        if not(isinstance(L_vec, PointVector) and isinstance(R_vec, PointVector)) or len(L_vec) != rounds or len(R_vec) != rounds:
+            return False
+        if 'zkopen' not in proof:
+            return isinstance(proof['a'], Scalar)
+        R, z1, z2 = proof['zkopen']
+        return isinstance(R, Point) and isinstance(z1, Scalar) and isinstance(z2, Scalar)
+    except (KeyError, TypeError, ValueError):
+        return False
+
+
+# whether a verifier committing in form (over G_table, if given) should check proof at all;
+# the form is the verifier's own, since a proof of the same P in another form opens it to
+# another v
+def _checkable(proof: dict, form: str, G_table: dumb25519.FixedBaseTable = None) -> bool:
+    return well_formed(proof) and proof.get('form') == form and _over_basis(proof, G_table)
+
+
+# replay the transcript of a well_formed proof in form: U, the round challenges u_vec (index
+# j is reversed) and c (None for non-hiding proofs)
+def _replay(proof: dict, form: str) -> tuple:
+    hiding = 'zkopen' in proof
+    transcript = _ipa_transcript(form, *proof['state'], hiding)
+    U = transcript.challenge_point('U')
     u_vec = ScalarVector()
-    for (L_j, R_j) in zip(L_vec, R_vec):
-        u_j = dumb25519.hash_to_scalar('LR Fiat-Shamir hash', *proof['state'], L_j, R_j)
-        u_vec.append(u_j)
+    for (L_j, R_j) in zip(proof['L'], proof['R']):
+        transcript.append('LR', L_j, R_j)
+        u_vec.append(transcript.challenge_scalar('u'))
+    if not hiding:
+        return U, u_vec, None
+    transcript.append('ZKopen', proof['zkopen'][0])
+    return U, u_vec, transcript.challenge_scalar('c')
+
+
+# Q = L_vec ** u_vec^2 + P + v * U + R_vec ** u_vec^-2, the commitment after all rounds
+def _folded_commitment(proof: dict, U: Point, u_vec: ScalarVector, u_vec_inv: ScalarVector) -> Point:
+    P, x, v = proof['state'][:3]
+    return proof['L'] ** (u_vec * u_vec) + P + v * U + proof['R'] ** (u_vec_inv * u_vec_inv)
+
+
+# b = s_vec ** b_vec, the folded evaluation vector
+# in 'coeff' form this is the product over j of (u_j^-1 + u_j * x ** 2^(k-1-j)), in O(log n)
+def _folded_evaluation(form: str, x: Scalar, u_vec: ScalarVector, u_vec_inv: ScalarVector) -> Scalar:
+    if form != 'coeff':
+        return challenge_expansion(u_vec, u_vec_inv)[1] ** evaluation_vector(form, x, 1 << len(u_vec))
+    b = 1
+    x_pow = x.x
+    for j in range(len(u_vec) - 1, -1, -1):
+        b = b * (u_vec_inv.ints[j] + u_vec.ints[j] * x_pow) % dumb25519.l
+        x_pow = x_pow * x_pow % dumb25519.l
+    return dumb25519._scalar(b)
+
+
+# terms of the final verification equation of a proof, which holds iff
+# scalars ** points + h * H + g_vec ** G_vec == Z
+def _verify_terms(proof: dict, form: str) -> tuple:
+    U, u_vec, c = _replay(proof, form)
+
+    # build s_vec and b
+    # G = s_vec ** G_vec is left to the caller, since it is the slow part; Accumulator
+    # defers it entirely (Subsection 3.2 from paper)
+    G_vec = proof['state'][3]
+    with instrument.phase('verify_s_vec'):
+        b_vec = evaluation_vector(form, proof['state'][1], len(G_vec))
+        u_vec_inv, s_vec = challenge_expansion(u_vec)
+        b = s_vec ** b_vec
+    Q = _folded_commitment(proof, U, u_vec, u_vec_inv)
+
+    # non-hiding: Q - a * (G + b * U) == Z
+    if c is None:
+        a = proof['a']
+        return ScalarVector([Scalar(1), -(a * b)]), PointVector([Q, U]), Scalar(0), s_vec * (-a)
+
+    # zero knowledge opening: c * Q + R - z1 * (G + b * U) - z2 * H == Z
+    R, z1, z2 = proof['zkopen']
+    return ScalarVector([c, Scalar(1), -(z1 * b)]), PointVector([Q, R, U]), -z2, s_vec * (-z1)
+
+
+# G_table: the verifier's own basis; a proof stated over any other G_vec fails
+# without a table, the proof's G_vec is used as it is
+# form: the verifier's commitment form; a proof in any other form fails
+def verify(proof: dict, G_table: dumb25519.FixedBaseTable = None, form: str = 'coeff') -> bool:
+    if not _checkable(proof, form, G_table):
+        return False
+    scalars, points, h, g_vec = _verify_terms(proof, form)
+    G_vec = proof['state'][3]
+    with instrument.phase('final_check'):
+        G = g_vec ** G_vec if G_table is None else G_table.multiexp(g_vec)
+        return scalars ** points + H_table.mul(h) + G == dumb25519.Z
+
+
+# verify many proofs at once: every final equation is weighted by a random scalar
+# and the sum is checked with a single multiexp over the union of all bases
+def verify_batch(proofs: list, G_table: dumb25519.FixedBaseTable = None, form: str = 'coeff') -> bool:
+    scalars = ScalarVector()
+    points = PointVector()
+    h = Scalar(0)
+    groups = []   # [G_vec, combined scalars] for every distinct G_vec
+    for proof in proofs:
+        if not _checkable(proof, form, G_table):
+            return False
+        w = dumb25519.random_scalar()   # random weight
+        terms, bases, h_j, g_vec = _verify_terms(proof, form)
+        scalars.extend(terms * w)
+        points.extend(bases)
+        h += h_j * w
+        _add_to_group(groups, proof['state'][3], g_vec * w)
+    with instrument.phase('final_check'):
+        return scalars ** points + H_table.mul(h) + _groups_total(groups, G_table) == dumb25519.Z
+
 
-    # build s_vec (be careful on indices), G, and b
-    # this is slow, hence this is the reason behind the 'amortization strategy'
-    # (Subsection 3.2 from paper), but we will not implement it here
+# whether a proof is stated over the basis of G_table (always, without a table)
+def _over_basis(proof: dict, G_table: dumb25519.FixedBaseTable = None) -> bool:
     G_vec = proof['state'][3]
-    dlen = len(G_vec)
-    b_vec = powers(proof['state'][1], dlen - 1)
-    s_vec = ScalarVector()
-    for i in range(dlen):
-        bin = i
-        prod = Scalar(1)
-        for j in range(len(u_vec) - 1, -1, -1):   # reverse
-            bit = bin & 1
-            if bit == 1:
-                prod *= u_vec[j]
-            else:
-                prod *= u_vec[j].invert()
-            bin >>= 1
-        s_vec.append(prod)
-    G = s_vec ** G_vec
-    b = s_vec ** b_vec
-
-    # build P_prm and Q
-    U = dumb25519.hash_to_point('U Fiat-Shamir hash', *proof['state'])
-    P_prm = proof['state'][0] + proof['state'][2] * U
-    u_vec_sqrd = u_vec * u_vec
-    Q = L_vec ** u_vec_sqrd + P_prm + R_vec ** u_vec_sqrd.invert()
-
-    # verify zero knowledge opening
-    R = proof['zkopen'][0]
-    c = dumb25519.hash_to_scalar('ZKopen Fiat-Shamir hash', Q, R)
-    z1 = proof['zkopen'][1]
-    z2 = proof['zkopen'][2]
-    return c * Q + R == z1 * (G + b  * U) + z2 * H
+    return G_table is None or G_vec is G_table.points or G_vec == G_table.points
+
+
+# add g_vec to the combined scalars of its G_vec
+def _add_to_group(groups: list, G_vec: PointVector, g_vec: ScalarVector):
+    for group in groups:
+        if group[0] is G_vec or (len(group[0]) == len(G_vec) and group[0] == G_vec):
+            group[1] += g_vec
+            return
+    groups.append([G_vec, g_vec])
+
+
+# sum of g_vec ** G_vec over the groups
+# with a table, the callers have checked every proof with _over_basis, so there is a single
+# group and it is always evaluated over the trusted table, never over the proofs' G_vec
+def _groups_total(groups: list, G_table: dumb25519.FixedBaseTable = None) -> Point:
+    if G_table is not None:
+        total = dumb25519.Z
+        for G_vec, g_vec in groups:
+            total += G_table.multiexp(g_vec)
+        return total
+    scalars = ScalarVector()
+    points = PointVector()
+    for G_vec, g_vec in groups:
+        scalars.extend(g_vec)
+        points.extend(G_vec)
+    return scalars ** points if len(points) > 0 else dumb25519.Z
+
+
+# amortized verification (Subsection 3.2 from paper): add() checks a proof against the
+# G = s_vec ** G_vec claimed by the prover, in O(log n) group operations, and keeps
+# (G_vec, u_vec, G). discharge() then checks all claimed G at once with random weights:
+# sum w_i * G_i == (sum w_i * s_vec_i) ** G_vec, a single multiexp per G_vec
+class Accumulator:
+    def __init__(self):
+        self.deferred = []   # (G_vec, u_vec, u_vec_inv, G)
+
+    def __len__(self) -> int:
+        return len(self.deferred)
+
+    # check everything but G; a proof that fails is not accumulated
+    #    * G: claimed s_vec ** G_vec (default: proof['G']; proofs decoded by wire claim none,
+    #      so they fail unless G is given)
+    #    * form: the verifier's commitment form, as in verify
+    #    * G_table: the verifier's own basis, as in verify (discharge checks it again)
+    def add(self, proof: dict, G: Point = None, form: str = 'coeff', G_table: dumb25519.FixedBaseTable = None) -> bool:
+        entry = self._check(proof, G, form, G_table)
+        if entry is None:
+            return False
+        self.deferred.append(entry)
+        return True
+
+    # add() for proofs that stand or fall together, such as the levels of a verkle path:
+    # nothing is accumulated unless every proof passes
+    def add_all(self, proofs: list, form: str = 'coeff', G_table: dumb25519.FixedBaseTable = None) -> bool:
+        entries = []
+        for proof in proofs:
+            entry = self._check(proof, None, form, G_table)
+            if entry is None:
+                return False
+            entries.append(entry)
+        self.deferred.extend(entries)
+        return True
+
+    # the deferred entry of a proof that passes add(), or None
+    def _check(self, proof: dict, G: Point, form: str, G_table: dumb25519.FixedBaseTable = None) -> tuple:
+        if not _checkable(proof, form, G_table):
+            return None
+        if G is None:
+            G = proof.get('G')
+        if not isinstance(G, Point):
+            return None
+        U, u_vec, c = _replay(proof, form)
+        u_vec_inv = u_vec.invert()
+        b = _folded_evaluation(form, proof['state'][1], u_vec, u_vec_inv)
+        Q = _folded_commitment(proof, U, u_vec, u_vec_inv)
+
+        if c is None:   # non-hiding: Q - a * (G + b * U) == Z
+            a = proof['a']
+            if Q != a * (G + b * U):
+                return None
+        else:   # zero knowledge opening: c * Q + R - z1 * (G + b * U) - z2 * H == Z
+            R, z1, z2 = proof['zkopen']
+            if ScalarVector([c, Scalar(1), -(z1 * b), -z1]) ** PointVector([Q, R, U, G]) != H_table.mul(z2):
+                return None
+        return (proof['state'][3], u_vec, u_vec_inv, G)
+
+    # check all deferred G at once and empty the accumulator
+    # G_table: the verifier's own basis, as in verify; any proof added over another G_vec fails
+    def discharge(self, G_table: dumb25519.FixedBaseTable = None) -> bool:
+        deferred = self.deferred
+        self.deferred = []
+        groups = []
+        weights = ScalarVector()
+        claims = PointVector()
+        for G_vec, u_vec, u_vec_inv, G in deferred:
+            if G_table is not None and G_vec is not G_table.points and G_vec != G_table.points:
+                return False
+            w = dumb25519.random_scalar()   # random weight
+            _add_to_group(groups, G_vec, challenge_expansion(u_vec, u_vec_inv)[1] * w)
+            weights.append(-w)
+            claims.append(G)
+        if len(claims) == 0:
+            return True
+        with instrument.phase('final_check'):
+            return weights ** claims + _groups_total(groups, G_table) == dumb25519.Z
+
+
+# indices of the proofs that fail verification, found by bisecting failed batches
+def find_invalid(proofs: list, G_table: dumb25519.FixedBaseTable = None, form: str = 'coeff') -> list:
+    if verify_batch(proofs, G_table, form):
+        return []
+    if len(proofs) == 1:
+        return [0]
+    mid = len(proofs) // 2
+    left = find_invalid(proofs[:mid], G_table, form)
+    right = find_invalid(proofs[mid:], G_table, form)
+    return left + [mid + i for i in right]
+
+
+# PCS multiproof: many openings (P_i, x_i, v_i) reduced to a single IPA proof
+# Source: https://dankradfeist.de/ethereum/2021/06/18/pcs-multiproofs.html
+#    * openings: list of (P, x, v, a_vec, r), all committed over G_vec in the same form
+#    * hiding: see prove; all r must then be zero
+def prove_multi(G_vec: PointVector, openings: list, G_table: dumb25519.FixedBaseTable = None, form: str = 'coeff',
+                hiding: bool = True) -> dict:
+    if len(openings) == 0:
+        raise ValueError('no openings to prove')
+    transcript = Transcript('multiproof')
+    transcript.append('openings', *[item for opening in openings for item in opening[:3]])
+    rho = transcript.challenge_scalar('r')
+    rho_vec = powers(rho, len(openings) - 1)
+
+    # g(X) = sum rho^i * (f_i(X) - v_i) / (X - x_i), committed as D
+    g_vec = ScalarVector._from_ints([0 for i in range(len(G_vec))])
+    for i, (P, x, v, a_vec, r) in enumerate(openings):
+        if form == 'eval':
+            g_vec += polynomial.domain(len(G_vec)).divide_linear(a_vec, x) * rho_vec[i]
+        else:
+            g_vec += poly_div_linear(a_vec, x) * rho_vec[i]
+    r_g = dumb25519.random_scalar() if hiding else Scalar(0)   # blinding factor
+    D = commit(G_vec, g_vec, r_g, G_table)
+
+    # h(X) = sum rho^i * f_i(X) / (t - x_i), so that h(t) - g(t) = sum rho^i * v_i / (t - x_i)
+    transcript.append('D', D)
+    t = transcript.challenge_scalar('t')
+    coeffs = ScalarVector([t - opening[1] for opening in openings]).invert() * rho_vec
+    h_vec = ScalarVector._from_ints([0 for i in range(len(G_vec))])
+    r_h = Scalar(0)
+    for i, (P, x, v, a_vec, r) in enumerate(openings):
+        h_vec += a_vec * coeffs[i]
+        r_h += r * coeffs[i]
+    E = PointVector([opening[0] for opening in openings]) ** coeffs
+    y = ScalarVector([opening[2] for opening in openings]) ** coeffs
+
+    transcript = prove(G_vec, E - D, t, y, h_vec - g_vec, r_h - r_g, form, hiding, G_table)
+    return {'D': D, 'ipa': transcript}
+
+
+#    * openings: list of (P, x, v)
+#    * form: the verifier's commitment form, as in verify
+def verify_multi(openings: list, proof: dict, G_table: dumb25519.FixedBaseTable = None, form: str = 'coeff') -> bool:
+    if len(openings) == 0 or not isinstance(proof, dict) or not isinstance(proof.get('D'), Point) or not well_formed(proof.get('ipa')):
+        return False
+    transcript = Transcript('multiproof')
+    transcript.append('openings', *[item for opening in openings for item in opening])
+    rho = transcript.challenge_scalar('r')
+    rho_vec = powers(rho, len(openings) - 1)
+    D = proof['D']
+    transcript.append('D', D)
+    t = transcript.challenge_scalar('t')
+    try:
+        coeffs = ScalarVector([t - opening[1] for opening in openings]).invert() * rho_vec
+    except ZeroDivisionError:
+        return False
+    E = PointVector([opening[0] for opening in openings]) ** coeffs
+    y = ScalarVector([opening[2] for opening in openings]) ** coeffs
+
+    # the single IPA proof must open E - D at t to y
+    P, x, v = proof['ipa']['state'][:3]
+    if P != E - D or x != t or v != y:
+        return False
+    return verify(proof['ipa'], G_table, form)
 
 
 if __name__ == '__main__':
@@ -116,7 +469,7 @@ if __name__ == '__main__':
     v = poly_eval(x, a_vec)
     G_vec = PointVector([dumb25519.random_point() for i in range(len(a_vec))])
     r = dumb25519.random_scalar()   # blinding factor
-    P = a_vec ** G_vec + r * H   # the actual commitment
+    P = commit(G_vec, a_vec, r)   # the actual commitment
 
     # test 1 (should work)
     print('Test 1: start prover')
@@ -153,4 +506,34 @@ if __name__ == '__main__':
     if verify(transcript):
         print('Something\'s wrong :(')
     else:
-        print('Prover you\'re desperate!')
\ No newline at end of file
+        print('Prover you\'re desperate!')
+
+    # test 5 (should work): amortized verification of several proofs
+    a_vec[1] -= Scalar(1)
+    print('Test 5: start prover')
+    transcripts = [prove(G_vec, P, x, v, a_vec, r) for i in range(3)]
+    print('Test 5: start verifier')
+    accumulator = Accumulator()
+    if all(accumulator.add(transcript) for transcript in transcripts) and accumulator.discharge():
+        print('Verified!')
+    else:
+        print('Something\'s wrong :(')
+
+    # test 6 (should NOT work)
+    print('Test 6: start verifier')
+    accumulator.add(transcripts[0])
+    accumulator.deferred[0] = accumulator.deferred[0][:3] + (transcripts[0]['G'] + dumb25519.G,)   # wrong claimed G
+    if accumulator.discharge():
+        print('Something\'s wrong :(')
+    else:
+        print('Prover you\'re desperate!')
+
+    # test 7 (should work, then NOT work): non-hiding proofs of an unblinded commitment
+    print('Test 7: start prover')
+    P = commit(G_vec, a_vec, Scalar(0))
+    transcript = prove(G_vec, P, x, v, a_vec, Scalar(0), hiding=False)
+    print('Test 7: start verifier')
+    if verify(transcript) and not verify(prove(G_vec, P, x, v + Scalar(1), a_vec, Scalar(0), hiding=False)):
+        print('Verified!')
+    else:
+        print('Something\'s wrong :(')
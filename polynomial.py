@@ -1,37 +1,50 @@
 # Polynomial evaluation and Lagrange interpolation
 #
-# unoptimized
+# unoptimized, except for the fixed domains of Domain
 
 from dumb25519 import Scalar, Point, ScalarVector, PointVector
 import dumb25519
+import functools
 
 
 # list of powers of x: [x ** 0, x ** 1, x ** 2, ..., x ** degree]
 #    * x: Scalar
 #    * degree: int
 def powers(x: Scalar, degree: int) -> ScalarVector:
-    powers_x = ScalarVector()
-    for i in range(degree + 1):
-        powers_x.append(x ** i)
-    return powers_x
+    powers_x = [1]
+    for i in range(degree):
+        powers_x.append(powers_x[-1] * x.x % dumb25519.l)
+    return ScalarVector._from_ints(powers_x)
 
 
 # polynomial evaluation poly_eval(x)
 #    * coeff: ScalarVector of coefficients
 def poly_eval(x: Scalar, coeff: ScalarVector) -> Scalar:
-    degree = len(coeff) - 1
-    return powers(x, degree) ** coeff
+    result = 0
+    for c in reversed(coeff.ints):   # Horner's method
+        result = (result * x.x + c) % dumb25519.l
+    return dumb25519._scalar(result)
 
 
 # polynomial multiplication
 #    * poly_a: ScalarVector of polynomial 'a'
 #    * poly_b: ScalarVector of polynomial 'b'
 def poly_mul(poly_a: ScalarVector, poly_b: ScalarVector) -> ScalarVector:
-    prod = [Scalar(0) for i in range(len(poly_a) + len(poly_b) - 1)]
-    for i in range(len(poly_a)):
-        for j in range(len(poly_b)):
-            prod[i + j] += poly_a[i] * poly_b[j]
-    return ScalarVector(prod)
+    prod = [0 for i in range(len(poly_a) + len(poly_b) - 1)]
+    for i, a in enumerate(poly_a.ints):
+        for j, b in enumerate(poly_b.ints):
+            prod[i + j] += a * b   # reduced once at the end
+    return ScalarVector._from_ints([c % dumb25519.l for c in prod])
+
+
+# quotient of (poly(X) - poly(z)) / (X - z) by synthetic division, padded to len(coeff)
+#    * coeff: ScalarVector of coefficients
+#    * z: Scalar
+def poly_div_linear(coeff: ScalarVector, z: Scalar) -> ScalarVector:
+    quot = [0 for i in range(len(coeff))]
+    for k in range(len(coeff) - 1, 0, -1):
+        quot[k - 1] = (coeff.ints[k] + z.x * quot[k]) % dumb25519.l
+    return ScalarVector._from_ints(quot)
 
 
 # Lagrange interpolation
@@ -49,6 +62,103 @@ def lagrange(coords: list) -> ScalarVector:
     return poly
 
 
+# Interpolation domain x = 1, 2, ..., width with precomputed barycentric data
+#    * width: int
+class Domain:
+    def __init__(self, width: int):
+        l = dumb25519.l
+        self.width = width
+
+        # vanishing polynomial A(X) = (X - 1)(X - 2)...(X - width)
+        vanishing = [1]
+        for x in range(1, width + 1):
+            vanishing = [((vanishing[k - 1] if k > 0 else 0) - x * (vanishing[k] if k < len(vanishing) else 0)) % l
+                         for k in range(len(vanishing) + 1)]
+        self.vanishing = ScalarVector._from_ints(vanishing)
+
+        # inverse denominators: the domain points differ by +-k, so 1/k for k = 1..width suffice
+        self.inv = [0] + ScalarVector._from_ints(list(range(1, width + 1))).invert().ints
+
+        # barycentric weights w_i = 1 / A'(x_i) = (-1)^(width - x_i) / ((x_i - 1)! (width - x_i)!)
+        fact = [1]
+        inv_fact = [1]
+        for k in range(1, width):
+            fact.append(fact[-1] * k % l)
+            inv_fact.append(inv_fact[-1] * self.inv[k] % l)
+        self.weights = ScalarVector._from_ints([(-1) ** (width - 1 - i) * inv_fact[i] * inv_fact[width - 1 - i] % l
+                                                for i in range(width)])
+        self.weights_inv = ScalarVector._from_ints([(-1) ** (width - 1 - i) * fact[i] * fact[width - 1 - i] % l
+                                                    for i in range(width)])
+        self._basis = None
+
+    # coefficients of the Lagrange basis polynomials L_i(X) = w_i * A(X) / (X - x_i), built on first use
+    def basis(self) -> list:
+        if self._basis is None:
+            self._basis = [poly_div_linear(self.vanishing, Scalar(i + 1))[:self.width] * self.weights[i]
+                           for i in range(self.width)]
+        return self._basis
+
+    # coefficients of the polynomial through (x_i, ys[i]), in O(width^2)
+    #    * ys: ScalarVector of evaluations
+    def interpolate(self, ys: ScalarVector) -> ScalarVector:
+        poly = [0 for i in range(self.width)]
+        for y, basis in zip(ys.ints, self.basis()):
+            if y == 0:
+                continue
+            for k, c in enumerate(basis.ints):
+                poly[k] += y * c   # reduced once at the end
+        return ScalarVector._from_ints([c % dumb25519.l for c in poly])
+
+    # [L_0(z), L_1(z), ..., L_{width-1}(z)], with one batched inversion
+    #    * z: Scalar
+    def lagrange_coeffs(self, z: Scalar) -> ScalarVector:
+        l = dumb25519.l
+        if 1 <= z.x <= self.width:
+            coeffs = [0 for i in range(self.width)]
+            coeffs[z.x - 1] = 1
+            return ScalarVector._from_ints(coeffs)
+        A_z = poly_eval(z, self.vanishing)
+        inv = ScalarVector._from_ints([(z.x - i - 1) % l for i in range(self.width)]).invert()
+        return ScalarVector._from_ints([A_z.x * w * d % l for w, d in zip(self.weights.ints, inv.ints)])
+
+    # evaluation at z of the polynomial through (x_i, ys[i]), without interpolating
+    #    * ys: ScalarVector of evaluations
+    #    * z: Scalar
+    def evaluate(self, ys: ScalarVector, z: Scalar) -> Scalar:
+        return self.lagrange_coeffs(z) ** ys
+
+
+    # evaluations of (f(X) - f(z)) / (X - z) on the domain, from the evaluations of f
+    #    * ys: ScalarVector of evaluations of f
+    #    * z: Scalar
+    def divide_linear(self, ys: ScalarVector, z: Scalar) -> ScalarVector:
+        l = dumb25519.l
+        ys = ys.ints
+        if not 1 <= z.x <= self.width:
+            y = self.evaluate(ScalarVector._from_ints(ys), z).x
+            inv = ScalarVector._from_ints([(i + 1 - z.x) % l for i in range(self.width)]).invert()
+            return ScalarVector._from_ints([(f - y) * d % l for f, d in zip(ys, inv.ints)])
+
+        # z = x_m: q_j = (f_j - f_m) / (x_j - x_m) for j != m, and q_m = -sum_j (w_j / w_m) * q_j
+        m = z.x - 1
+        quot = [0 for i in range(self.width)]
+        q_m = 0
+        for j in range(self.width):
+            if j == m:
+                continue
+            d = self.inv[j - m] if j > m else l - self.inv[m - j]
+            quot[j] = (ys[j] - ys[m]) * d % l
+            q_m -= self.weights.ints[j] * quot[j]
+        quot[m] = q_m * self.weights_inv.ints[m] % l
+        return ScalarVector._from_ints(quot)
+
+
+# memoized Domain per width
+@functools.lru_cache(maxsize=None)
+def domain(width: int) -> Domain:
+    return Domain(width)
+
+
 if __name__ == '__main__':
     my_points = [(Scalar(-1), dumb25519.random_scalar()),
                 (Scalar(0), dumb25519.random_scalar()),
@@ -62,4 +172,18 @@ if __name__ == '__main__':
     if passed:
         print('The implementation of Lagrange interpolation works!')
     else:
-        print('There\'s a problem in the implementation of Lagrange interpolation.')
\ No newline at end of file
+        print('There\'s a problem in the implementation of Lagrange interpolation.')
+
+    # test on a fixed domain
+    my_ys = ScalarVector([dumb25519.random_scalar() for i in range(4)])
+    my_coeffs = domain(4).interpolate(my_ys)
+    z = dumb25519.random_scalar()
+    passed = all(poly_eval(Scalar(i + 1), my_coeffs) == my_ys[i] for i in range(4))
+    passed &= (domain(4).evaluate(my_ys, z) == poly_eval(z, my_coeffs))
+    for x in [Scalar(2), z]:   # quotient by (X - x), inside and outside the domain
+        my_quot = domain(4).divide_linear(my_ys, x)
+        passed &= (domain(4).interpolate(my_quot) == poly_div_linear(my_coeffs, x))
+    if passed:
+        print('The implementation of domain interpolation works!')
+    else:
+        print('There\'s a problem in the implementation of domain interpolation.')
\ No newline at end of file
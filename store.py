@@ -0,0 +1,213 @@
+# Memory-mapped files of fixed-width records for tree data
+# Datablocks, node hashes, commitments (32-byte compressed) and per-node polynomials are kept
+# on disk and decoded only when accessed, so trees do not have to fit in memory as Python
+# objects, and a saved tree can be reopened without rebuilding it
+#
+# layout of a TreeStore directory:
+#    * meta.json: parameters of the tree
+#    * blocks.bin: datablocks, as dumb25519.encode of a str or bytes, zero-padded
+#    * hashes{i}.bin: node hashes of level i of a Merkle tree, built by merkle.MerkleTree or
+#      merkle.StreamingMerkleTree
+#    * commits{i}.bin, nodes{i}.bin: commitments and (polynomial, blinding factor) of level i
+#      of a Verkle tree
+
+from dumb25519 import Scalar, Point, ScalarVector, PointVector
+import json, mmap, os
+import dumb25519
+
+
+# records of record_size bytes, created with count zero-filled records or opened as they are
+# subclasses decode records on __getitem__ and encode values on __setitem__
+class RecordFile:
+    def __init__(self, path: str, record_size: int, count: int = None):
+        if count is not None:
+            with open(path, 'wb') as f:
+                f.truncate(count * record_size)
+        self.path = path
+        self.record_size = record_size
+        self.file = open(path, 'r+b')
+        size = os.fstat(self.file.fileno()).st_size
+        if size % record_size != 0:
+            raise ValueError('file is not made of whole records')
+        self.count = size // record_size
+        self.mmap = mmap.mmap(self.file.fileno(), 0) if size > 0 else None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.path!r}, {self.count} records)'
+
+    def _offset(self, i: int) -> int:
+        if i < 0:
+            i += self.count
+        if not(0 <= i < self.count):
+            raise IndexError
+        return i * self.record_size
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.count))]
+        offset = self._offset(i)
+        return self.decode(self.mmap[offset:offset + self.record_size])
+
+    def __setitem__(self, i: int, value):
+        data = self.check(value)
+        offset = self._offset(i)
+        self.mmap[offset:offset + self.record_size] = data.ljust(self.record_size, b'\0')
+
+    # the encoding of value, or an error if value cannot be stored; writes nothing
+    def check(self, value) -> bytes:
+        data = self.encode(value)
+        if len(data) > self.record_size:
+            raise ValueError('value does not fit in a record')
+        return data
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+    def encode(self, value) -> bytes:
+        return value
+
+    def decode(self, data: bytes):
+        return data
+
+    def flush(self):
+        if self.mmap is not None:
+            self.mmap.flush()
+
+    def close(self):
+        if self.mmap is not None:
+            self.mmap.close()
+        self.file.close()
+
+
+class ScalarFile(RecordFile):
+    def __init__(self, path: str, count: int = None):
+        super().__init__(path, 32, count)
+
+    def encode(self, value: Scalar) -> bytes:
+        return value.to_bytes()
+
+    def decode(self, data: bytes) -> Scalar:
+        return Scalar.from_bytes(data)
+
+
+class PointFile(RecordFile):
+    def __init__(self, path: str, count: int = None):
+        super().__init__(path, 32, count)
+
+    def encode(self, value: Point) -> bytes:
+        return value.to_bytes()
+
+    def decode(self, data: bytes) -> Point:
+        return Point.from_bytes(data)
+
+
+# (polynomial, blinding factor) of a node: width scalars, then the blinding factor
+class NodeFile(RecordFile):
+    def __init__(self, path: str, width: int, count: int = None):
+        self.width = width
+        super().__init__(path, 32 * (width + 1), count)
+
+    def encode(self, value: tuple) -> bytes:
+        poly, r = value
+        return b''.join(x.to_bytes(32, 'little') for x in poly.ints) + r.to_bytes()
+
+    def decode(self, data: bytes) -> tuple:
+        ints = [int.from_bytes(data[32 * k:32 * (k + 1)], 'little') for k in range(self.width + 1)]
+        if max(ints) >= dumb25519.l:
+            raise ValueError('non-canonical scalar in node record')
+        return ScalarVector._from_ints(ints[:-1]), dumb25519._scalar(ints[-1])
+
+
+# datablocks of type str or bytes, in the encoding hashed by dumb25519.hash_bytes_to_scalar
+class BlockFile(RecordFile):
+    def encode(self, value) -> bytes:
+        if not isinstance(value, (str, bytes)):
+            raise TypeError('only str and bytes datablocks can be stored')
+        return dumb25519.encode(value)
+
+    def decode(self, data: bytes):
+        length = int.from_bytes(data[1:5], 'little')
+        payload = bytes(data[5:5 + length])
+        return payload.decode('utf-8') if data[:1] == b'T' else payload
+
+
+class TreeStore:
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def save_meta(self, meta: dict):
+        with open(self._path('meta.json'), 'w') as f:
+            json.dump(meta, f)
+
+    def load_meta(self) -> dict:
+        with open(self._path('meta.json')) as f:
+            return json.load(f)
+
+    # blocks: datablocks to write, or None to open the saved ones; they are streamed to the
+    # file, so any sequence works, and so does a one-shot iterator (e.g. merkle.read_blocks)
+    # given count and record_size. the returned file is itself a sequence that trees accept
+    #    * record_size: bytes per block record (default: the longest encoded block)
+    #    * count: number of blocks (default: len(blocks))
+    def blocks(self, blocks=None, record_size: int = None, count: int = None) -> BlockFile:
+        path = self._path('blocks.bin')
+        if blocks is None:
+            return BlockFile(path, self.load_meta()['block_size'])
+        if isinstance(blocks, BlockFile) and os.path.abspath(blocks.path) == os.path.abspath(path):
+            return blocks   # already the blocks of this store
+        if count is None:
+            count = len(blocks)
+        if record_size is None:
+            record_size = max(len(dumb25519.encode(block)) for block in blocks)
+        records = BlockFile(path, record_size, count)
+        written = 0
+        for block in blocks:
+            if written == count:
+                raise ValueError('more blocks than count')
+            records[written] = block
+            written += 1
+        if written != count:
+            raise ValueError('fewer blocks than count')
+        return records
+
+    # count: number of records of a new level file, or None to open a saved one
+    def hashes(self, level: int, count: int = None) -> ScalarFile:
+        return ScalarFile(self._path(f'hashes{level}.bin'), count)
+
+    def commits(self, level: int, count: int = None) -> PointFile:
+        return PointFile(self._path(f'commits{level}.bin'), count)
+
+    def nodes(self, level: int, width: int, count: int = None) -> NodeFile:
+        return NodeFile(self._path(f'nodes{level}.bin'), width, count)
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    store = TreeStore(tempfile.mkdtemp())
+    data = ['6m68fxp', b'dh15yea', 'a longer datablock', '']
+    blocks = store.blocks(data)
+    commits = store.commits(0, 2)
+    nodes = store.nodes(0, 4, 2)
+    P = dumb25519.random_point()
+    node = (ScalarVector([dumb25519.random_scalar() for i in range(4)]), dumb25519.random_scalar())
+    commits[1] = P
+    nodes[1] = node
+    store.save_meta({'block_size': blocks.record_size})
+    for records in (blocks, commits, nodes):
+        records.close()
+
+    # test: records read back after reopening
+    passed = list(store.blocks()) == data
+    passed &= store.commits(0)[1] == P and store.nodes(0, 4)[1] == node
+    if passed:
+        print('The implementation of record files works!')
+    else:
+        print('There\'s a problem in the implementation of record files.')
@@ -0,0 +1,58 @@
+# Fiat-Shamir transcript
+# Merlin-style: a running blake2s state absorbs labelled messages once, and every
+# challenge is squeezed from (and then absorbed into) that state
+#
+# unoptimized
+
+from dumb25519 import Scalar, Point
+from hashlib import blake2s
+import dumb25519
+
+
+class Transcript:
+    def __init__(self, label: str):
+        self.state = blake2s(dumb25519.HASH_VERSION + b' transcript')
+        self.append('transcript', label)
+
+    # absorb labelled data
+    #    * data: Scalar, Point, ScalarVector, PointVector, bytes or str
+    def append(self, label: str, *data):
+        self.state.update(dumb25519.encode(label))
+        for datum in data:
+            self.state.update(dumb25519.encode(datum))
+
+    # squeeze a Scalar challenge
+    def challenge_scalar(self, label: str) -> Scalar:
+        self.append('challenge scalar', label)
+        digest = self.state.digest()
+        self.state.update(digest)   # later challenges depend on this one
+        return dumb25519._digest_to_scalar(digest)
+
+    # squeeze a Point challenge in the main subgroup
+    def challenge_point(self, label: str) -> Point:
+        self.append('challenge point', label)
+        point = dumb25519._digest_to_point(self.state.copy())
+        self.state.update(point.to_bytes())   # later challenges depend on this one
+        return point
+
+    # independent copy of the current state
+    def fork(self):
+        forked = Transcript.__new__(Transcript)
+        forked.state = self.state.copy()
+        return forked
+
+
+if __name__ == '__main__':
+    # prover and verifier derive the same challenges from the same messages
+    P = dumb25519.random_point()
+    prover = Transcript('test')
+    prover.append('statement', P)
+    verifier = Transcript('test')
+    verifier.append('statement', P)
+    passed = prover.challenge_scalar('c') == verifier.challenge_scalar('c')
+    passed &= prover.challenge_point('U') == verifier.challenge_point('U')
+    passed &= verifier.fork().challenge_scalar('c') == verifier.challenge_scalar('c')
+    if passed:
+        print('The implementation of the transcript works!')
+    else:
+        print('There\'s a problem in the implementation of the transcript.')
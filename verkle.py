@@ -5,13 +5,79 @@
 
 from dumb25519 import Scalar, Point, ScalarVector, PointVector
 from polynomial import powers, poly_eval, lagrange
-from polycommit import prove, verify
-import dumb25519, polycommit
+from polycommit import prove, verify, verify_batch, prove_multi, verify_multi
+from params import PublicParams
+from store import TreeStore, RecordFile
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+import dumb25519, polycommit, polynomial
+
+
+# bounded LRU cache of single-level opening proofs, keyed by (level, node, child position)
+class ProofCache:
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize   # 0 disables caching
+        self.entries = OrderedDict()
+        self.children = {}   # (level, node) -> cached child positions, for invalidation
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> dict:
+        proof = self.entries.get(key)
+        if proof is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return proof
+
+    def put(self, key: tuple, proof: dict):
+        if self.maxsize <= 0:
+            return
+        self.entries[key] = proof
+        self.entries.move_to_end(key)
+        self.children.setdefault(key[:2], set()).add(key[2])
+        while len(self.entries) > self.maxsize:
+            old, _ = self.entries.popitem(last=False)
+            self._forget(old)
+
+    # drop every proof opening the given node
+    def invalidate(self, level: int, node: int):
+        for child in self.children.pop((level, node), ()):
+            del self.entries[(level, node, child)]
+
+    def clear(self):
+        self.entries.clear()
+        self.children.clear()
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.entries), 'maxsize': self.maxsize}
+
+    def _forget(self, key: tuple):
+        children = self.children[key[:2]]
+        children.discard(key[2])
+        if not children:
+            del self.children[key[:2]]
 
 
 class VerkleTree:
-    def __init__(self, datablocks: list, exponent: int):
+    def __init__(self, datablocks: list, exponent: int, form: str = 'coeff', cache_size: int = 1024,
+                 params: PublicParams = None, hiding: bool = True, table_budget: int = dumb25519.TABLE_BUDGET):
         # the number of children of parent node is 2 ** exponent. exponent is not checked
+        # form is how nodes are committed: 'coeff' interpolates the child hashes and commits the
+        # coefficients over G_vec, 'eval' commits the child hashes directly over the Lagrange basis
+        # params: public parameters of width 2 ** exponent (default: the deterministic ones)
+        # hiding=False commits without blinding factors and proves without zero knowledge,
+        # for public data (see polycommit.prove)
+        # table_budget: most points in the fixed-base table of the commitment basis, in this
+        # process and in every worker (see dumb25519.FixedBaseTable); wide trees need more than
+        # the default for commitments to become table lookups
+        if form not in ('coeff', 'eval'):
+            raise ValueError(f'unknown commitment form {form!r}')
+        if params is None:
+            params = PublicParams.get(2 ** exponent)
+        elif params.width != 2 ** exponent:
+            raise ValueError('width of params does not match 2 ** exponent')
         datalength = len(datablocks)
         # check datalength
         if datalength == 0:
@@ -27,42 +93,126 @@ class VerkleTree:
 
         self.depth = exponent2 // exponent   # tree depth minus the level of datablocks
         self.exponent = exponent
-        self.datablocks = datablocks
+        self.form = form
+        self.params = params
+        self.hiding = hiding
+        self.table_budget = table_budget
+        # updates write to the datablocks, so a list is copied rather than shared with the
+        # caller; sequences on disk (see TreeStore.blocks) are used as they are
+        self.datablocks = list(datablocks) if isinstance(datablocks, list) else datablocks
         self.verkletreecommits = []
         self.verkletreeblipoly = []
+        self.store = None
+        self.proof_cache = ProofCache(cache_size)   # opening proofs of hot nodes
+
+    # reopen a tree saved by buildVerkleTree(store=...), without rebuilding it
+    @classmethod
+    def open(cls, store: TreeStore, cache_size: int = 1024, params: PublicParams = None,
+             table_budget: int = dumb25519.TABLE_BUDGET):
+        meta = store.load_meta()
+        tree = cls(store.blocks(), meta['exponent'], meta['form'], cache_size, params, meta['hiding'], table_budget)
+        if tree.params.id.hex() != meta['params']:
+            raise ValueError('tree was built with other public parameters')
+        tree.store = store
+        tree.datablocks = store.blocks()
+        tree.verkletreecommits = [store.commits(i) for i in range(tree.depth)]
+        tree.verkletreeblipoly = [store.nodes(i, 2 ** tree.exponent) for i in range(tree.depth)]
+        tree._loadBasis()
+        return tree
+
+    def _loadBasis(self):
+        self.G_vec = self.params.G_vec   # (public)
+        self.basis_vec = self.params.basis(self.form)
+        self.basis_table = self.params.table(self.form, self.table_budget)   # fixed-base table for commitments (public)
+
+    # commitments and (polynomial, blinding factor) of the next level, count nodes each, in
+    # memory or in new record files of self.store
+    def _newLevel(self, count: int) -> tuple:
+        if self.store is None:
+            return [None] * count, [None] * count
+        level = len(self.verkletreecommits)
+        return self.store.commits(level, count), self.store.nodes(level, 2 ** self.exponent, count)
+
+    # the root commitment; a tree of a single datablock has no levels, and its root is the datablock
+    def _root(self) -> object:
+        if self.depth == 0:
+            return self.datablocks[0]
+        return self.verkletreecommits[-1][0]
 
     def hashAllCurrNodes(self, nodes: list) -> list:
-        return [dumb25519.hash_to_scalar('verkle', node) for node in nodes]
+        return [dumb25519.hash_bytes_to_scalar('verkle', node) for node in nodes]
 
-    def buildVerkleTree(self, printAllCommit=False) -> Point:
+    def buildVerkleTree(self, printAllCommit=False, workers: int = None, store: TreeStore = None) -> Point:
+        # workers: number of processes committing the nodes of each level in parallel (None: serial)
+        # store: keep the datablocks and every level in memory-mapped files instead of in memory
+        # levels are built one after the other, each from the one below, reading only the
+        # children of the nodes being committed; with a store, and datablocks that are a
+        # sequence on disk (see TreeStore.blocks), the tree never has to fit in memory
         veclen = 2 ** self.exponent   # vector/polynomial length
-        currnodes = self.datablocks
-        self.G_vec = PointVector([dumb25519.random_point() for i in range(veclen)])   # (public)
-        while len(currnodes) > 1:
-            cache1 = []   # for commitments (public)
-            cache2 = []   # for blinding factors and polynomial (private)
-            nodehashes = self.hashAllCurrNodes(currnodes)
-            for i in range(0, len(nodehashes), veclen):
-                coords = [(Scalar(j + 1), hash) for j, hash in enumerate(nodehashes[i:i + veclen])]
-                poly = lagrange(coords)   # polynomial coefficients
-                r = dumb25519.random_scalar()   # blinding factor
-                P = poly ** self.G_vec + r * polycommit.H   # the actual commitment
-                cache1.append(P)
-                cache2.append((poly, r))
-            self.verkletreecommits.append(cache1)
-            self.verkletreeblipoly.append(cache2)
-            currnodes = cache1
+        self._loadBasis()
+        self.proof_cache.clear()
+        self.verkletreecommits = []
+        self.verkletreeblipoly = []
+        if store is not None:
+            self.store = store
+            self.datablocks = store.blocks(self.datablocks)
+
+        children = self.datablocks
+        if workers is None or workers <= 1:
+            for level in range(self.depth):
+                commits, blipoly = self._newLevel(len(children) // veclen)   # (public), (private)
+                for j in range(len(commits)):
+                    evals = ScalarVector(self.hashAllCurrNodes(children[j * veclen:(j + 1) * veclen]))
+                    P, poly, r = _commit_node(evals, self.basis_vec, self.basis_table, self.form, self.hiding)
+                    commits[j] = P
+                    blipoly[j] = (poly, r)
+                self.verkletreecommits.append(commits)
+                self.verkletreeblipoly.append(blipoly)
+                children = commits
+        else:
+            basis_exts = [P.ext for P in self.basis_vec]
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(basis_exts, self.form, self.hiding, self.table_budget)) as executor:
+                for level in range(self.depth):
+                    count = len(children) // veclen
+                    commits, blipoly = self._newLevel(count)
+                    # shard whole nodes across workers, one batch of tasks at a time so that only
+                    # a batch of children is in memory; map() gathers the results in order
+                    size = max(1, min(count // (4 * workers), _TASK_NODES)) * veclen   # children per task
+                    step = 4 * workers * size   # children per batch
+                    j = 0
+                    for start in range(0, len(children), step):
+                        batch = children[start:start + step]
+                        if level > 0:
+                            batch = [P.ext for P in batch]
+                        tasks = [(level > 0, batch[i:i + size]) for i in range(0, len(batch), size)]
+                        for chunk in executor.map(_commit_chunk, tasks):
+                            for (P, poly, r) in chunk:
+                                commits[j] = Point._from_ext(P)
+                                blipoly[j] = (ScalarVector._from_ints(poly), dumb25519._scalar(r))
+                                j += 1
+                    self.verkletreecommits.append(commits)
+                    self.verkletreeblipoly.append(blipoly)
+                    children = commits
 
         if printAllCommit == True:
             print('Level 1 of tree is the datablocks.\n')
             for i in range(self.depth):
                 print(f'Level {i + 2} commitments of tree is: {self.verkletreecommits[i]}\n')
 
-        return currnodes[0]   # return verkle tree root commitment
+        if self.store is not None:
+            self.store.save_meta({'exponent': self.exponent, 'form': self.form, 'hiding': self.hiding,
+                                  'params': self.params.id.hex(), 'block_size': self.datablocks.record_size})
+        return self._root()   # return verkle tree root commitment
 
-    def requestData(self, index: int) -> tuple:
-        # TODO (if possible): PCS Multiproofs
-        # https://dankradfeist.de/ethereum/2021/06/18/pcs-multiproofs.html
+    # executor for requestData(executor=...), whose workers hold the commitment basis
+    def proofExecutor(self, workers: int) -> ProcessPoolExecutor:
+        basis_exts = [P.ext for P in self.basis_vec]
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(basis_exts, self.form, self.hiding, self.table_budget))
+
+    def requestData(self, index: int, executor: Executor = None) -> tuple:
+        # see requestMany for PCS Multiproofs
+        # openings are served from self.proof_cache when possible; the missing levels are
+        # proven in parallel on executor (from proofExecutor) if one is given
         print('Data request will be slower than in Merkle Tree. Please be patient.')
         num_blocks = len(self.datablocks)
         if not(0 <= index < num_blocks):
@@ -71,31 +221,230 @@ class VerkleTree:
         datum = self.datablocks[index]
         currpathdata = datum
         proofs = []
+        missing = []   # (level, key, opening) of the levels to prove
         for i in range(self.depth):
             # initialize prove
             curridx = index & ((1 << self.exponent) - 1)
-            x = Scalar(curridx + 1)
-            v = dumb25519.hash_to_scalar('verkle', currpathdata)
+            key = (i, index >> self.exponent, curridx)
             index >>= self.exponent   # move one level up the tree
-            curridx = index & ((1 << self.exponent) - 1)
-            P = self.verkletreecommits[i][curridx]
-            poly, r = self.verkletreeblipoly[i][curridx]
-            transcript = prove(self.G_vec, P, x, v, poly, r)
+            P = self.verkletreecommits[i][index]
+            transcript = self.proof_cache.get(key)
+            if transcript is None:
+                x = Scalar(curridx + 1)
+                v = dumb25519.hash_bytes_to_scalar('verkle', currpathdata)
+                poly, r = self.verkletreeblipoly[i][index]
+                missing.append((i, key, (P, x, v, poly, r)))
             proofs.append(transcript)
             currpathdata = P
+
+        if executor is None or len(missing) <= 1:
+            transcripts = [prove(self.basis_vec, *opening, self.form, self.hiding, self.basis_table) for (i, key, opening) in missing]
+        else:
+            tasks = [(P.ext, x.x, v.x, poly.ints, r.x) for (i, key, (P, x, v, poly, r)) in missing]
+            transcripts = list(executor.map(_prove_opening, tasks))
+            for transcript in transcripts:
+                transcript['state'][3] = self.basis_vec   # share the basis object with the tree
+        for (i, key, opening), transcript in zip(missing, transcripts):
+            self.proof_cache.put(key, transcript)
+            proofs[i] = transcript
         return datum, proofs
 
+    def update(self, index: int, datum: object) -> Point:
+        return self.update_many({index: datum})
+
+    def update_many(self, changes: dict) -> Point:
+        # patch each changed node in place: C' = C + delta * L_child(G), where delta is the change of
+        # the child hash, then carry the change of the node hash one level up. changes under the same
+        # ancestor are coalesced, so every dirty node is patched once per batch
+        num_blocks = len(self.datablocks)
+        for index in changes:
+            if not(0 <= index < num_blocks):
+                raise ValueError(f'index must be in range({num_blocks})')
+        L_vec = self.params.L_vec   # Lagrange basis points L_i(G) (public)
+        basis = polynomial.domain(2 ** self.exponent).basis()
+        mask = (1 << self.exponent) - 1
+
+        # child hash deltas of the lowest level; every change is hashed and checked to fit its
+        # record before any is written, so that a bad change leaves the tree as it was
+        deltas = {}
+        for index, datum in changes.items():
+            if isinstance(self.datablocks, RecordFile):
+                self.datablocks.check(datum)
+            delta = dumb25519.hash_bytes_to_scalar('verkle', datum) - dumb25519.hash_bytes_to_scalar('verkle', self.datablocks[index])
+            if delta != Scalar(0):
+                deltas[index] = delta
+        for index, datum in changes.items():
+            self.datablocks[index] = datum
+
+        for i in range(self.depth):
+            updated = {}   # node -> {child position: delta}
+            for child, delta in deltas.items():
+                updated.setdefault(child >> self.exponent, {})[child & mask] = delta
+            deltas = {}
+            for node, children in updated.items():
+                poly, r = self.verkletreeblipoly[i][node]
+                positions = sorted(children)
+                child_deltas = ScalarVector([children[j] for j in positions])
+                for j, delta in zip(positions, child_deltas):
+                    if self.form == 'eval':
+                        poly[j] += delta
+                    else:
+                        poly += basis[j] * delta
+                self.verkletreeblipoly[i][node] = (poly, r)
+
+                P = self.verkletreecommits[i][node]
+                P_new = P + child_deltas ** PointVector([L_vec[j] for j in positions])
+                self.verkletreecommits[i][node] = P_new
+                self.proof_cache.invalidate(i, node)
+                deltas[node] = dumb25519.hash_bytes_to_scalar('verkle', P_new) - dumb25519.hash_bytes_to_scalar('verkle', P)
+
+        return self._root()   # return new verkle tree root commitment
+
+    def requestMany(self, indices: list) -> tuple:
+        # one PCS multiproof for all openings on the paths of all indices
+        # https://dankradfeist.de/ethereum/2021/06/18/pcs-multiproofs.html
+        num_blocks = len(self.datablocks)
+        for index in indices:
+            if not(0 <= index < num_blocks):
+                raise ValueError(f'index must be in range({num_blocks})')
+
+        data = [self.datablocks[index] for index in indices]
+        openings = []
+        for (i, node, child) in _path_openings(indices, self.depth, self.exponent):
+            if i == 0:
+                v = dumb25519.hash_bytes_to_scalar('verkle', self.datablocks[child])
+            else:
+                v = dumb25519.hash_bytes_to_scalar('verkle', self.verkletreecommits[i - 1][child])
+            P = self.verkletreecommits[i][node]
+            poly, r = self.verkletreeblipoly[i][node]
+            openings.append((P, Scalar(child - (node << self.exponent) + 1), v, poly, r))
+
+        # commitments below the root on all paths (the verifier already has the root)
+        commits = [self.verkletreecommits[i][node] for (i, node) in _path_nodes(indices, self.depth, self.exponent)]
+        return data, {'commits': commits, 'multiproof': prove_multi(self.basis_vec, openings, self.basis_table, self.form, self.hiding)}
 
-def verifier(index: int, datum: object, proofs: list, root: Point) -> bool:
-    # first check: the v of the first proof should be the hash_to_scalar of datum
+
+# commit to one node from the hashes of its children
+def _commit_node(evals: ScalarVector, basis_vec: PointVector, basis_table: dumb25519.FixedBaseTable, form: str,
+                 hiding: bool = True) -> tuple:
+    poly = evals   # polynomial evaluations
+    if form == 'coeff':
+        poly = polynomial.domain(len(evals)).interpolate(evals)   # polynomial coefficients
+    r = dumb25519.random_scalar() if hiding else Scalar(0)   # blinding factor
+    P = polycommit.commit(basis_vec, poly, r, basis_table)   # the actual commitment
+    return P, poly, r
+
+
+# process-pool workers of buildVerkleTree: scalars travel as ints and points as
+# extended-coordinate int tuples, and each worker builds its own table once
+_worker = {}
+_TASK_NODES = 256   # most nodes committed by one task of a parallel build
+
+
+def _init_worker(basis_exts: list, form: str, hiding: bool = True, budget: int = dumb25519.TABLE_BUDGET):
+    _worker['basis_vec'] = PointVector([Point._from_ext(P) for P in basis_exts])
+    _worker['basis_table'] = dumb25519.FixedBaseTable(_worker['basis_vec'], budget)
+    _worker['form'] = form
+    _worker['hiding'] = hiding
+
+
+# commit to consecutive nodes from their children, datablocks or (if points) commitments;
+# returns (commitment, polynomial, blinding factor) per node
+def _commit_chunk(task: tuple) -> list:
+    points, children = task
+    if points:
+        children = [Point._from_ext(P) for P in children]
+    veclen = len(_worker['basis_vec'])
+    results = []
+    for i in range(0, len(children), veclen):
+        evals = ScalarVector([dumb25519.hash_bytes_to_scalar('verkle', child) for child in children[i:i + veclen]])
+        P, poly, r = _commit_node(evals, _worker['basis_vec'], _worker['basis_table'], _worker['form'], _worker['hiding'])
+        results.append((P.ext, poly.ints, r.x))
+    return results
+
+
+# prove one opening (P, x, v, poly, r), given as ints, over the worker's basis
+def _prove_opening(task: tuple) -> dict:
+    P, x, v, poly, r = task
+    opening = (Point._from_ext(P), dumb25519._scalar(x), dumb25519._scalar(v), ScalarVector._from_ints(poly), dumb25519._scalar(r))
+    return prove(_worker['basis_vec'], *opening, _worker['form'], _worker['hiding'], _worker['basis_table'])
+
+
+# (level, node) of every non-root node on the paths of indices, in canonical order
+def _path_nodes(indices: list, depth: int, exponent: int) -> list:
+    return sorted({(i, index >> (exponent * (i + 1))) for index in indices for i in range(depth - 1)})
+
+
+# (level, node, child) of every opening on the paths of indices, in canonical order
+def _path_openings(indices: list, depth: int, exponent: int) -> list:
+    return sorted({(i, index >> (exponent * (i + 1)), index >> (exponent * i)) for index in indices for i in range(depth)})
+
+
+def verifier(index: int, datum: object, proofs: list, root: Point, exponent: int, depth: int,
+             G_table: dumb25519.FixedBaseTable = None, accumulator: polycommit.Accumulator = None,
+             form: str = 'coeff') -> bool:
+    # exponent, depth and form are those of the verifier's tree, as in verifier_many
+    # G_table: the table of the tree's basis (default: that of the deterministic public parameters)
+    if G_table is None:
+        G_table = PublicParams.get(2 ** exponent).table(form)
+    if len(G_table.points) != 2 ** exponent or not(0 <= index < 1 << (exponent * depth)):
+        return False
+    if depth == 0:   # a tree of a single datablock, which is its own root
+        return len(proofs) == 0 and datum == root
+    if len(proofs) != depth or not all(polycommit.well_formed(proof) for proof in proofs):
+        return False
+    # first check: level i should open its node at the position of index in it, to the
+    # hash_bytes_to_scalar of the child below: datum, then the P of the proof of level i - 1
     # second check: the P of last proof should be the root
-    if proofs[0]['state'][2] != dumb25519.hash_to_scalar('verkle', datum) or proofs[-1]['state'][0] != root:
+    mask = (1 << exponent) - 1
+    child = datum
+    for i, proof in enumerate(proofs):
+        P, x, v = proof['state'][:3]
+        if x != Scalar(((index >> (exponent * i)) & mask) + 1) or v != dumb25519.hash_bytes_to_scalar('verkle', child):
+            return False
+        child = P
+    if child != root:
+        return False
+    # other checks: just verify the proofs, all at once! or, with an accumulator, check
+    # them in logarithmic time and leave their G to accumulator.discharge(); the proofs of
+    # a path that fails are not accumulated
+    if accumulator is not None:
+        return accumulator.add_all(proofs, form, G_table)
+    return verify_batch(proofs, G_table, form)
+
+
+def verifier_many(indices: list, data: list, proof: dict, root: Point, exponent: int, depth: int,
+                  G_table: dumb25519.FixedBaseTable = None, form: str = 'coeff') -> bool:
+    # exponent, depth and form are those of the verifier's tree (VerkleTree.exponent, .depth and
+    # .form), never the prover's: the tree has 2 ** exponent children per node and
+    # 2 ** (exponent * depth) datablocks
+    # G_table: as in verifier
+    if G_table is None:
+        G_table = PublicParams.get(2 ** exponent).table(form)
+    if len(indices) == 0 or len(indices) != len(data) or len(G_table.points) != 2 ** exponent:
         return False
-    for proof in proofs:
-        # other checks: just verify the proofs!
-        if not verify(proof):
+    for index in indices:
+        if not(0 <= index < 1 << (exponent * depth)):
             return False
-    return True
+    if not isinstance(proof, dict) or not isinstance(proof.get('commits'), list) or not isinstance(proof.get('multiproof'), dict):
+        return False
+    keys = _path_nodes(indices, depth, exponent)
+    if len(keys) != len(proof['commits']) or not all(isinstance(P, Point) for P in proof['commits']):
+        return False
+    commits = dict(zip(keys, proof['commits']))
+    commits[(depth - 1, 0)] = root
+
+    # rebuild every opening from the data and the path commitments
+    leaves = {}
+    for index, datum in zip(indices, data):
+        v = dumb25519.hash_bytes_to_scalar('verkle', datum)
+        if leaves.setdefault(index, v) != v:   # conflicting data for the same index
+            return False
+    openings = []
+    for (i, node, child) in _path_openings(indices, depth, exponent):
+        v = leaves[child] if i == 0 else dumb25519.hash_bytes_to_scalar('verkle', commits[(i - 1, child)])
+        openings.append((commits[(i, node)], Scalar(child - (node << exponent) + 1), v))
+    return verify_multi(openings, proof['multiproof'], G_table, form)
 
 
 if __name__ == '__main__':
@@ -112,7 +461,35 @@ if __name__ == '__main__':
     # (of polynomial commitment) are more important
 
     # verify provided proofs
-    if verifier(11, datum, proofs, root):
+    if verifier(11, datum, proofs, root, verkledata.exponent, verkledata.depth, verkledata.basis_table):
         print('\nProvided proofs are correct!')
     else:
-        print('\nProvided proofs are wrong!')
\ No newline at end of file
+        print('\nProvided proofs are wrong!')
+
+    # one multiproof for several data requests
+    indices = [2, 11, 12]
+    data_many, multiproof = verkledata.requestMany(indices)
+    print(f'data{indices}: {data_many}')
+    if verifier_many(indices, data_many, multiproof, root, verkledata.exponent, verkledata.depth, verkledata.basis_table):
+        print('\nProvided multiproof is correct!')
+    else:
+        print('\nProvided multiproof is wrong!')
+
+    # update a datablock without rebuilding the tree
+    root = verkledata.update(11, 'updated')
+    datum, proofs = verkledata.requestData(11)
+    if verifier(11, datum, proofs, root, verkledata.exponent, verkledata.depth, verkledata.basis_table):
+        print('\nProvided proofs after update are correct!')
+    else:
+        print('\nProvided proofs after update are wrong!')
+
+    # keep the tree in memory-mapped files, and reopen it without rebuilding
+    import tempfile
+    store = TreeStore(tempfile.mkdtemp())
+    root = VerkleTree(data, 2).buildVerkleTree(store=store)
+    verkledata = VerkleTree.open(store)
+    datum, proofs = verkledata.requestData(11)
+    if verifier(11, datum, proofs, root, verkledata.exponent, verkledata.depth, verkledata.basis_table):
+        print('\nProvided proofs from a reopened tree are correct!')
+    else:
+        print('\nProvided proofs from a reopened tree are wrong!')
\ No newline at end of file
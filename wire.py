@@ -0,0 +1,209 @@
+# Binary wire format of opening proofs (polycommit.prove) and verkle path proofs
+# (VerkleTree.requestData). Points and scalars take 32 bytes each, and the commitment
+# basis is referred to by the id of its public parameters instead of being sent
+#
+# layout, after a header of magic, version and kind:
+#    * opening proof: params id, form, P, x, v, rounds, (L_j, R_j) per round, then the opening
+#    * path proof: params id, form, depth, then per level P, rounds, (L_j, R_j), opening;
+#      x and v of every level follow from the index and the datum, so they are not sent
+# the opening is R, z1, z2 for hiding proofs and the folded a for non-hiding ones, which
+# are flagged in the form byte
+
+from dumb25519 import Scalar, Point, ScalarVector, PointVector
+import io, struct
+import dumb25519, params
+
+MAGIC = b'VKW'
+VERSION = 1
+KIND_PROOF = 1
+KIND_PATH = 2
+_HEADER = struct.Struct('<3sBB')   # magic, version, kind
+_FORMS = ('coeff', 'eval')
+_NON_HIDING = 0x80   # flag of the form byte
+ELEMENT_SIZE = 32   # compressed point or canonical scalar
+ID_SIZE = 32
+
+
+def _read(stream, size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise ValueError('truncated proof')
+    return data
+
+
+def _read_point(stream) -> Point:
+    return Point.from_bytes(_read(stream, ELEMENT_SIZE))
+
+
+def _read_scalar(stream) -> Scalar:
+    return Scalar.from_bytes(_read(stream, ELEMENT_SIZE))
+
+
+def _write_header(stream, kind: int, basis: PointVector, form: str, hiding: bool):
+    stream.write(_HEADER.pack(MAGIC, VERSION, kind))
+    stream.write(params.find(basis, form).id)
+    stream.write(bytes([_FORMS.index(form) | (0 if hiding else _NON_HIDING)]))
+
+
+# returns the commitment basis and hiding flag named by the header, whose form must be
+# expected_form: the form is the verifier's own, never the prover's
+def _read_header(stream, kind: int, expected_form: str) -> tuple:
+    magic, version, kind_read = _HEADER.unpack(_read(stream, _HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('not a proof of a supported version')
+    if kind_read != kind:
+        raise ValueError('unexpected kind of proof')
+    public = params.lookup(_read(stream, ID_SIZE))
+    form = _read(stream, 1)[0]
+    hiding = not form & _NON_HIDING
+    form &= ~_NON_HIDING
+    if form >= len(_FORMS):
+        raise ValueError('unknown commitment form')
+    if _FORMS[form] != expected_form:
+        raise ValueError('proof is not in the expected commitment form')
+    return public.basis(expected_form), hiding
+
+
+# the rounds and the opening, shared by both kinds
+def _write_body(stream, proof: dict):
+    stream.write(bytes([len(proof['L'])]))
+    for L_j, R_j in zip(proof['L'], proof['R']):
+        stream.write(L_j.to_bytes() + R_j.to_bytes())
+    if 'zkopen' in proof:
+        R, z1, z2 = proof['zkopen']
+        stream.write(R.to_bytes() + z1.to_bytes() + z2.to_bytes())
+    else:
+        stream.write(proof['a'].to_bytes())
+
+
+def _read_body(stream, statement: list, form: str, hiding: bool) -> dict:
+    rounds = _read(stream, 1)[0]
+    if 1 << rounds != len(statement[3]):
+        raise ValueError('number of rounds does not match length of G_vec')
+    L_vec = PointVector()
+    R_vec = PointVector()
+    for j in range(rounds):
+        L_vec.append(_read_point(stream))
+        R_vec.append(_read_point(stream))
+    if not hiding:
+        return {'state': statement, 'form': form, 'L': L_vec, 'R': R_vec, 'a': _read_scalar(stream)}
+    zkopen = [_read_point(stream), _read_scalar(stream), _read_scalar(stream)]
+    return {'state': statement, 'form': form, 'L': L_vec, 'R': R_vec, 'zkopen': zkopen}
+
+
+# stream an opening proof
+def encode_proof(proof: dict, stream):
+    P, x, v, G_vec = proof['state']
+    _write_header(stream, KIND_PROOF, G_vec, proof['form'], 'zkopen' in proof)
+    stream.write(P.to_bytes() + x.to_bytes() + v.to_bytes())
+    _write_body(stream, proof)
+
+
+#    * form: the verifier's commitment form
+def decode_proof(stream, form: str = 'coeff') -> dict:
+    G_vec, hiding = _read_header(stream, KIND_PROOF, form)
+    statement = [_read_point(stream), _read_scalar(stream), _read_scalar(stream), G_vec]
+    return _read_body(stream, statement, form, hiding)
+
+
+# stream the opening proofs of a path, from the leaf level up to the root
+def encode_path(proofs: list, stream):
+    G_vec = proofs[0]['state'][3]
+    _write_header(stream, KIND_PATH, G_vec, proofs[0]['form'], 'zkopen' in proofs[0])
+    stream.write(bytes([len(proofs)]))
+    for proof in proofs:
+        stream.write(proof['state'][0].to_bytes())
+        _write_body(stream, proof)
+
+
+# x and v of each level are rebuilt from the index and the datum; they are only what the
+# prover claims, and verkle.verifier checks them, and the basis, against the verifier's tree
+#    * depth, form: the depth and form of the verifier's tree
+def decode_path(stream, index: int, datum: object, depth: int, form: str = 'coeff') -> list:
+    G_vec, hiding = _read_header(stream, KIND_PATH, form)
+    exponent = len(G_vec).bit_length() - 1
+    if _read(stream, 1)[0] != depth:
+        raise ValueError('proof is not of the depth of the tree')
+    proofs = []
+    v = dumb25519.hash_bytes_to_scalar('verkle', datum)
+    for i in range(depth):
+        P = _read_point(stream)
+        x = Scalar((index & ((1 << exponent) - 1)) + 1)
+        index >>= exponent
+        proofs.append(_read_body(stream, [P, x, v, G_vec], form, hiding))
+        v = dumb25519.hash_bytes_to_scalar('verkle', P)
+    return proofs
+
+
+def dumps_proof(proof: dict) -> bytes:
+    stream = io.BytesIO()
+    encode_proof(proof, stream)
+    return stream.getvalue()
+
+
+def loads_proof(data: bytes, form: str = 'coeff') -> dict:
+    return decode_proof(io.BytesIO(data), form)
+
+
+def dumps_path(proofs: list) -> bytes:
+    stream = io.BytesIO()
+    encode_path(proofs, stream)
+    return stream.getvalue()
+
+
+def loads_path(data: bytes, index: int, datum: object, depth: int, form: str = 'coeff') -> list:
+    return decode_path(io.BytesIO(data), index, datum, depth, form)
+
+
+# encoded size in bytes, by part, of an opening proof or of a path (list of opening proofs)
+def proof_size(proof) -> dict:
+    proofs = proof if isinstance(proof, list) else [proof]
+    header = _HEADER.size + ID_SIZE + 1
+    if isinstance(proof, list):
+        header += 1   # depth
+        statement = len(proofs) * ELEMENT_SIZE   # P only
+    else:
+        statement = 3 * ELEMENT_SIZE   # P, x, v
+    rounds = sum(1 + 2 * len(p['L']) * ELEMENT_SIZE for p in proofs)
+    opening = sum((3 if 'zkopen' in p else 1) * ELEMENT_SIZE for p in proofs)
+    return {'header': header, 'statement': statement, 'rounds': rounds, 'opening': opening,
+            'total': header + statement + rounds + opening}
+
+
+if __name__ == '__main__':
+    from verkle import VerkleTree, verifier
+
+    data = [f'block {i}' for i in range(64)]
+    verkledata = VerkleTree(data, 3)
+    root = verkledata.buildVerkleTree()
+    datum, proofs = verkledata.requestData(42)
+
+    # test: opening proofs and path proofs survive a round trip
+    encoded = dumps_proof(proofs[0])
+    passed = len(encoded) == proof_size(proofs[0])['total']
+    passed &= dumps_proof(loads_proof(encoded)) == encoded
+    encoded = dumps_path(proofs)
+    passed &= len(encoded) == proof_size(proofs)['total']
+    passed &= verifier(42, datum, loads_path(encoded, 42, datum, verkledata.depth), root, 3, verkledata.depth)
+    passed &= not verifier(42, datum, loads_path(encoded, 43, datum, verkledata.depth), root, 3, verkledata.depth)
+
+    # test: the same for non-hiding proofs
+    verkledata = VerkleTree(data, 3, hiding=False)
+    root = verkledata.buildVerkleTree()
+    datum, proofs = verkledata.requestData(42)
+    encoded = dumps_path(proofs)
+    passed &= len(encoded) == proof_size(proofs)['total']
+    passed &= verifier(42, datum, loads_path(encoded, 42, datum, verkledata.depth), root, 3, verkledata.depth)
+    print(f'non-hiding path proof: {proof_size(proofs)}')
+
+    # test: a path in another form, or of another depth, than the verifier's tree is rejected
+    for depth, form in [(verkledata.depth, 'eval'), (verkledata.depth + 1, 'coeff')]:
+        try:
+            loads_path(encoded, 42, datum, depth, form)
+            passed = False
+        except ValueError:
+            pass
+    if passed:
+        print('The implementation of the proof wire format works!')
+    else:
+        print('There\'s a problem in the implementation of the proof wire format.')